@@ -0,0 +1,224 @@
+"""
+Program:     PyStrange benchmarks
+Description: measure iteration, search and export throughput of PyStrange
+             and compare the results with a stored baseline
+License:     GNU General Public License version 2 (see pystrange.py)
+"""
+
+# import modules
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import pystrange
+
+# map modes of the iteration and search benchmarks
+map_modes = ['2d_12', '2d_20', '3d_30', '3d_60', '3d_105']
+
+# parameter string of the export benchmark (2D attractor of the examples)
+export_string = 'AGWXDCUKEANF'
+
+
+# run function repeat times, return best wall clock time in seconds and result of the last run
+def measure(function, repeat):
+
+    best = math.inf
+    for r in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+
+    return best, result
+
+
+# draw seeded random parameter sets until one stays in bounds for length iterations, return its coefficient rows
+def get_bounded_coefficients(m, t, iterate, map_function, rng, length=1000, tries=100000):
+
+    points = np.empty((int(m[0]), length + 1))
+    for k in range(tries):
+        string = pystrange.get_random_strings(pystrange.coeff, int(m[3:]), 1, rng)[0]
+        c = pystrange.get_coefficient_rows(pystrange.get_coefficient(string, pystrange.coeff), int(m[0]))
+        points[:, 0] = pystrange.start_value
+        with np.errstate(all='ignore'):
+            if iterate(points, 0, length, c, map_function, t, pystrange.probe_settings['bound']) is None:
+                return c
+
+    raise RuntimeError('no bounded parameter set for {} found'.format(m))
+
+
+# steps per second of the iteration function of every map mode (map and flow with all integrators):
+# a seeded random parameter set staying in bounds is iterated without bound, only the steps until the
+# iteration gives up (rk45 without convergence of the step size) are counted
+def benchmark_iteration(results, steps, repeat, probe):
+
+    rng = np.random.default_rng(0)
+    for m in map_modes:
+        map_function = pystrange.get_map_function(m)
+        variants = [('map', None, 'euler')]
+        if m[0:2] == '3d':
+            variants += [('flow_' + integrator, 0.01, integrator) for integrator in ('euler', 'rk4', 'rk45')]
+
+        for name, t, integrator in variants:
+            settings = dict(probe, integrator=integrator)
+            iterate = pystrange.get_iteration_function(m, t, settings)
+            c = get_bounded_coefficients(m, t, iterate, map_function, rng)
+            points = np.empty((int(m[0]), steps + 1))
+            points[:, 0] = pystrange.start_value
+
+            with np.errstate(all='ignore'):
+                seconds, i = measure(lambda: iterate(points, 0, steps, c, map_function, t, math.inf), repeat)
+            results['iterate/{}/{}'.format(m, name)] = {'value': (steps if i is None else i + 1) / seconds,
+                                                        'unit': 'steps/s', 'higher': True}
+
+
+# candidates per second of the random search with a fixed seed, sequential and with batch probe stage
+def benchmark_search(results, number, repeat, probe):
+
+    for m in ('2d_12', '3d_30'):
+        for batch_size in (0, 1000):
+            seconds, (found, rejections) = measure(
+                lambda: pystrange.search_attractors(m, number=number, points=2000, seed=42, batch_size=batch_size,
+                                                    probe=probe), repeat)
+            results['search/{}/batch_{}'.format(m, batch_size)] = {'value': number / seconds, 'unit': 'candidates/s',
+                                                                   'higher': True, 'found': len(found)}
+
+
+# export time and peak memory (traced python and numpy allocations) of every output format and number of points,
+# the points are calculated once before, output files are written to a temporary directory
+def benchmark_export(results, sizes, formats, repeat):
+
+    points, info = pystrange.compute_attractor('2d_12', export_string, points=max(sizes), first=0)
+    directory = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as temp:
+        os.chdir(temp)
+        try:
+            for output_mode in formats:
+                for size in sizes:
+                    try:
+                        export = lambda: pystrange.plot_point_cloud(points[0, :size], points[1, :size], 0, '2d',
+                                                                    output_mode, export_string, 'benchmark')
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            tracemalloc.start()
+                            seconds, result = measure(export, repeat)
+                            peak = tracemalloc.get_traced_memory()[1]
+                            tracemalloc.stop()
+                    except ImportError as error:
+                        tracemalloc.stop()
+                        print('skipping {} export: {}'.format(output_mode, error))
+                        break
+
+                    results['export/{}/{}'.format(output_mode, size)] = {'value': seconds, 'unit': 's',
+                                                                         'higher': False}
+                    results['memory/{}/{}'.format(output_mode, size)] = {'value': peak / 2**20, 'unit': 'MB',
+                                                                         'higher': False}
+                    for name in os.listdir(temp):
+                        os.remove(name)
+        finally:
+            os.chdir(directory)
+
+
+# run the selected benchmarks and write the results to a json file
+def run(args):
+
+    probe = dict(pystrange.probe_settings, backend=args.backend)
+    results = {}
+
+    if 'iteration' in args.suites:
+        benchmark_iteration(results, args.steps, args.repeat, probe)
+    if 'search' in args.suites:
+        benchmark_search(results, args.candidates, args.repeat, probe)
+    if 'export' in args.suites:
+        benchmark_export(results, args.sizes, args.formats, args.repeat)
+
+    for name, result in results.items():
+        print('{:32} {:14.4g} {}'.format(name, result['value'], result['unit']))
+
+    report = {'meta': {'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(),
+                       'system': platform.system(), 'backend': pystrange.get_backend(probe),
+                       'date': time.strftime('%Y-%m-%d %H:%M:%S')},
+              'results': results}
+    with open(args.output, 'w') as outfile:
+        json.dump(report, outfile, indent=2)
+    print('results saved to', args.output)
+
+
+# compare results with a baseline, flag results worse than the baseline by more than threshold (relative),
+# return number of regressions
+def compare(args):
+
+    with open(args.baseline) as infile:
+        baseline = json.load(infile)['results']
+    with open(args.results) as infile:
+        results = json.load(infile)['results']
+
+    regressions = 0
+    for name in sorted(set(baseline) & set(results)):
+        old, new = baseline[name]['value'], results[name]['value']
+        change = (new - old) / old if old else 0.0
+        worse = -change if baseline[name]['higher'] else change
+        flag = ''
+        if worse > args.threshold:
+            flag = 'REGRESSION'
+            regressions += 1
+        print('{:32} {:14.4g} {:14.4g} {:+8.1%} {}'.format(name, old, new, change, flag))
+
+    for name in sorted(set(baseline) ^ set(results)):
+        print('{:32} only in {}'.format(name, 'baseline' if name in baseline else 'results'))
+
+    print('{} regression(s) with threshold {:.0%}'.format(regressions, args.threshold))
+    return regressions
+
+
+# main function
+def main():
+
+    parser = argparse.ArgumentParser(description='Benchmarks of PyStrange')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parser_run = commands.add_parser('run', help='run benchmarks and save the results as json')
+    parser_run.add_argument('-o', '--output', type=str, default='benchmark.json',
+                            help='json file of the results, default: "benchmark.json"')
+    parser_run.add_argument('--suites', type=str, nargs='*', default=['iteration', 'search', 'export'],
+                            choices=['iteration', 'search', 'export'], help='benchmarks to run, default: all')
+    parser_run.add_argument('--steps', type=int, default=100000,
+                            help='iterations per map mode, default: 100000')
+    parser_run.add_argument('--candidates', type=int, default=2000,
+                            help='candidates of the random search, default: 2000')
+    parser_run.add_argument('--sizes', type=int, nargs='*', default=[100000, 1000000, 10000000],
+                            help='numbers of exported points, default: 100000 1000000 10000000')
+    parser_run.add_argument('--formats', type=str, nargs='*', default=['png', 'html', 'obj', 'ply', 'npy'],
+                            help='exported formats, default: png html obj ply npy')
+    parser_run.add_argument('--repeat', type=int, default=3,
+                            help='runs per benchmark, the best run counts, default: 3')
+    parser_run.add_argument('--backend', type=str, default='auto', choices=['auto', 'numba', 'numpy'],
+                            help='backend of the iteration (see pystrange.py --backend), default: "auto"')
+
+    parser_compare = commands.add_parser('compare', help='compare results with a baseline')
+    parser_compare.add_argument('baseline', type=str, help='json file of the baseline')
+    parser_compare.add_argument('results', type=str, help='json file of the results')
+    parser_compare.add_argument('--threshold', type=float, default=0.1,
+                                help='relative change flagged as regression, default: 0.1')
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run(args)
+    elif compare(args) > 0:
+        sys.exit(1)
+
+
+# execute only if run as a script
+if __name__ == "__main__":
+    main()
@@ -23,35 +23,49 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 
 # import modules
 import numpy as np
-import matplotlib.pyplot as plt
 import random
 import sys
 import argparse
 import re
-from mpl_toolkits.mplot3d import Axes3D
-import plotly
-import plotly.graph_objs as go
-from scipy.interpolate import InterpolatedUnivariateSpline
-
-# use syle seaborn
-plt.style.use('seaborn')
+import math
+import itertools
+import functools
+import struct
+import zlib
+import multiprocessing
+import collections
+import contextlib
+import io
+import time as clock
+import os
+import json
+import hashlib
+import sqlite3
+import shlex
+import shutil
+import subprocess
+
+# matplotlib, plotly and the optional numba are imported on first use (see get_pyplot, get_plotly, get_numba)
 
 description=\
 '''
 Use PyStrange to plot 2D or 3D attractors in Random Search
 Mode or Single Search Mode. You can choose between two quadratic
 and two cubic maps/flows and one quartic map/flow ("2d_12", "3d_30", "2d_20", "3d_60", "3d_105").
+Polynomial maps/flows of any degree are available as "2d_N" or "3d_N" with N coefficients,
+for example "2d_30" (quartic) or "3d_168" (quintic).
 It is recommended to use large values for option "-n", especially
 if maps with 30 or 60 coefficients are used.
 To use Single Search Mode you can use a specific parameter set (option "-s") in the form
-of a character string (12, 20, 30 or 60 capital letters).
+of a character string (12, 20, 30, 60 or 105 capital letters).
 Parameters for the coefficients of the quadratic and cubic functions
 range from -1.2 (letter A) to + 1.3 (Letter Z).
 If option "-s" is passed, option "-n" will be ignored.
-Attractors can be exported in three different formats (option "-o"):
-"png" (via matplotlib), "html" (via plotly) or "obj" (wavefront).
+Attractors can be exported in six different formats (option "-o"):
+"png" (density image or via matplotlib), "html" (via plotly), "frames" (animation
+of the build-up), "obj" (wavefront), "ply" (binary point cloud) or "npy" (numpy array).
 3D Plots via plotly will produce interactive Javascript visualizations.
-The wavefront format can be used to import points clouds to Blender.
+The wavefront and ply formats can be used to import points clouds to Blender.
 You can specify multiple output formats, for example "-o png html".
 Set the number of points to calculated with option "-p".
 You can specify to plot only every n'th point with option "-j".
@@ -75,260 +89,1143 @@ coeff = {'A': -1.2, 'B': -1.1, 'C': -1.0,
          'V':  0.9, 'W':  1.0, 'X':  1.1,
          'Y':  1.2, 'Z':  1.3}
 
+# default settings of the probe stage: number of iterations, window and threshold of the diversity test,
+# bound of the coordinates, minimal lyapunov exponent of the chaos test (None: no chaos test),
+# estimate lyapunov exponent as score, decimals of the rounded states for the detection of periodic orbits,
+# integrator of flow mode ("euler", "rk4" or adaptive "rk45") and tolerance of the adaptive steps,
+# backend of the iteration ("numba" kernels, "numpy" or "auto": numba if it is installed) and symmetry group
+# of the parameter strings ("none", "permute": permutations of the coordinates, "full": also sign flips),
+# minimal number of occupied cells and minimal correlation dimension of the quality test (None: no test)
+probe_settings = {'length': 1000, 'window': 100, 'threshold': 50, 'bound': 10, 'lyapunov': None,
+                  'score': False, 'cycle': 10, 'integrator': 'euler', 'tolerance': 1e-6, 'backend': 'auto',
+                  'symmetry': 'none', 'cells': None, 'dimension': None}
+
+# default settings of the streaming quality statistics: number of cells of the occupancy grid (the same number
+# per axis), size of the reservoir sample, smallest and largest radius (relative to the extent of the sample)
+# and number of radii of the pair counts of the correlation dimension
+quality_settings = {'cells': 2**18, 'sample': 1000, 'radii': (0.01, 0.1), 'steps': 8}
+
+# default settings of the batch probe (option -b): number of candidates per backend below which the remaining
+# candidates leave the batch and are probed one by one (a batch step costs about as much as 20 to 30 scalar steps
+# of the numpy backend and some hundred of the compiled kernels, a batch step of the rk45 integrator, which has no
+# compiled kernel, as much as about 60 scalar steps)
+batch_settings = {'fallback': {'numpy': 24, 'numba': 512, 'rk45': 64}}
+
+# start value of all coordinates
+start_value = 0.1
+
+# default settings of the trajectory cache: directory (None: no cache), maximal size in megabytes
+# and precision of the stored points ("float64", "float32" or "float16")
+cache_settings = {'directory': None, 'size': 1024, 'precision': 'float64'}
+
+# default settings of the output: renderer of png output ("density" image or matplotlib "scatter" plot),
+# size of density image in pixels, tone mapping ("log" or "gamma"), gamma and color of the points,
+# number of points per chunk of the trajectory written to the outputs, maximal number of points of html output
+# (0: all points), plotly.js of html output ("directory": shared file next to the html files, "cdn" or "inline"),
+# number of chains of ensemble mode (1: single trajectory), new points per frame of the frames output,
+# command encoding the frames (None: png files) and precision of the stored and exported points
+# ("float64", "float32" or "float16", the iteration is always done in float64)
+render_settings = {'renderer': 'density', 'size': 1000, 'tone': 'log', 'gamma': 0.5, 'color': (0x4c, 0x72, 0xb0),
+                   'chunk': 100000, 'budget': 200000, 'plotlyjs': 'directory', 'ensemble': 1, 'frame': 10000,
+                   'encoder': None, 'precision': 'float64'}
+
+# default settings of enumeration mode: range of indices of the parameter strings (start, stop) (None: all strings),
+# checkpoint file (None: no checkpoint) and minimal seconds between two checkpoints
+enumeration_settings = {'range': None, 'checkpoint': None, 'interval': 60}
+
+# default settings of atlas mode: pixels per axis, pixels per axis of a tile (computed at once),
+# score of the pixels ("escape": iteration out of bounds, "lyapunov": lyapunov exponent,
+# "diversity": maximal number of different values of a coordinate in the probe window)
+# and iterations between two renormalizations of the shadow trajectory of the lyapunov score
+atlas_settings = {'size': 256, 'tile': 64, 'score': 'lyapunov', 'interval': 10}
+
+# options of the items of batch render mode with the names of the command line options
+batch_options = {'points': int, 'time': float, 'first': int, 'jump': int, 'interpolate': int,
+                 'output': lambda value: value.split(',')}
+
+
+# timers and counters of the stages of a run (options --profile and --metrics-file): seconds and calls per stage,
+# rejections per stage and iteration (histogram with bins of powers of two) and other counters, events of single
+# attractors are written as json lines to the metrics file (worker processes keep them for the main process).
+# the disabled profiler returns a shared empty context for every stage, so the instrumented code runs at full speed
+class Profiler:
+
+    def __init__(self):
+        self.enabled = False
+        self.events = None
+        self.pending = None
+        self.reset()
+
+    def reset(self):
+        self.seconds = collections.Counter()
+        self.calls = collections.Counter()
+        self.rejections = collections.defaultdict(collections.Counter)
+        self.counters = collections.Counter()
+        if self.pending != None:
+            self.pending = []
+
+    def enable(self, metrics_file=None):
+        self.enabled = True
+        self.events = open(metrics_file, 'w') if metrics_file != None else None
+
+    def stage(self, name):
+        if not self.enabled:
+            return null_context
+        return self.timer(name)
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        start = clock.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += clock.perf_counter() - start
+            self.calls[name] += 1
+
+    def count(self, name, value=1):
+        if self.enabled:
+            self.counters[name] += value
+
+    # count rejection at iteration in the bin of the largest power of two not above the iteration
+    def reject(self, stage, iteration, count=1):
+        if self.enabled:
+            self.rejections[stage][1 << (iteration.bit_length() - 1) if iteration > 0 else 0] += count
+
+    # write event as json line (the file is flushed, so worker processes do not inherit buffered lines)
+    def event(self, **fields):
+        if self.events != None:
+            self.events.write(json.dumps(fields, default=int) + '\n')
+            self.events.flush()
+        elif self.pending != None:
+            self.pending.append(fields)
+
+    def get_metrics(self):
+        return {'stages': {name: {'seconds': self.seconds[name], 'calls': self.calls[name]} for name in self.seconds},
+                'rejections': {stage: dict(sorted(bins.items())) for stage, bins in self.rejections.items()},
+                'counters': dict(self.counters)}
+
+    # return metrics and reset them (None if disabled), the metrics of worker processes are merged by the main process
+    def collect(self):
+        if not self.enabled:
+            return None
+        metrics = dict(self.get_metrics(), events=self.pending or [])
+        self.reset()
+        return metrics
+
+    def merge(self, metrics):
+        if metrics == None:
+            return
+        for name, stage in metrics['stages'].items():
+            self.seconds[name] += stage['seconds']
+            self.calls[name] += stage['calls']
+        for stage, bins in metrics['rejections'].items():
+            self.rejections[stage].update(bins)
+        self.counters.update(metrics['counters'])
+        for fields in metrics.get('events', []):
+            self.event(**fields)
+
+    # format summary table of stages, rejections (count per bin of iterations) and counters
+    def format_summary(self):
+        total = sum(self.seconds.values())
+        lines = ['{:16} {:>10} {:>12} {:>7}'.format('stage', 'calls', 'seconds', 'share')]
+        for name, seconds in self.seconds.most_common():
+            lines.append('{:16} {:10d} {:12.4f} {:6.1f}%'.format(name, self.calls[name], seconds,
+                                                                  100 * seconds / total if total > 0 else 0))
+        lines.append('{:16} {:>10}  {}'.format('rejection', 'count', 'iterations from: count'))
+        for stage, bins in sorted(self.rejections.items()):
+            lines.append('{:16} {:10d}  {}'.format(stage, sum(bins.values()),
+                                                   ', '.join('{}: {}'.format(k, n) for k, n in sorted(bins.items()))))
+        for name, value in sorted(self.counters.items()):
+            lines.append('{:16} {:10d}'.format(name, value))
+
+        return '\n'.join(lines)
+
+    # write summary to the metrics file and close it, print summary table
+    def finish(self, summary=False):
+        self.event(event='summary', **self.get_metrics())
+        if self.events != None:
+            self.events.close()
+            self.events = None
+        if summary:
+            print(self.format_summary())
+
+
+# profiler of the stages of this process (disabled unless enabled by option --profile or --metrics-file)
+null_context = contextlib.nullcontext()
+profiler = Profiler()
+
+
+# enable profiler of a worker process (without metrics file, the metrics and events are collected by the main process)
+def enable_worker_profiler(enabled):
+    profiler.enabled = enabled
+    profiler.events = None
+    profiler.pending = [] if enabled else None
+    profiler.reset()
+
+
+# get exponent table of all monomials in dim variables up to degree,
+# rows ordered like the coefficients of the parameter strings (1, x, xx, xy, ..., z, zz)
+def get_exponent_table(dim, degree):
+
+    variables = 'xyz'[:dim]
+    monomials = sorted(''.join(factors) for order in range(degree + 1)
+                       for factors in itertools.combinations_with_replacement(variables, order))
+
+    return np.array([[monomial.count(v) for v in variables] for monomial in monomials], dtype=int)
+
+
+# get polynomial degree of map mode (e.g. 2 for "3d_30", 4 for "2d_30"), None if mode is invalid
+def get_map_degree(m):
+
+    match = re.fullmatch(r'([23])d_(\d+)', m)
+    if match is None:
+        return None
+
+    dim, num_coefficients = int(match.group(1)), int(match.group(2))
+    degree = 1
+    while dim * math.comb(dim + degree, degree) < num_coefficients:
+        degree += 1
+    if dim * math.comb(dim + degree, degree) != num_coefficients:
+        return None
+
+    return degree
+
+
+# create source code of a polynomial map/flow: the power table is computed once per step,
+# every monomial once for all dimensions, followed by the product coefficient matrix x monomial vector
+def get_polynomial_source(name, dim, degree):
+
+    variables = 'xyz'[:dim]
+    lines = ['def {}({}, c):'.format(name, ', '.join(variables))]
+
+    # power table
+    for v in variables:
+        for e in range(2, degree + 1):
+            lines.append('    {0}{1} = {0}{2} * {0}'.format(v, e, e - 1 if e > 2 else ''))
+
+    # monomial vector
+    monomials = []
+    for j, exponents in enumerate(get_exponent_table(dim, degree)):
+        factors = ['{}{}'.format(v, e if e > 1 else '') for v, e in zip(variables, exponents) if e > 0]
+        if len(factors) < 2:
+            monomials.append(''.join(factors))
+        else:
+            lines.append('    m{} = {}'.format(j, ' * '.join(factors)))
+            monomials.append('m{}'.format(j))
 
-# calculate coordinates of a quadratic map with 12 coefficients (2 dimensions)
-def map_2d_12(x, y, c):
+    # coefficient matrix x monomial vector
+    rows = []
+    for d in range(dim):
+        terms = ['c[{}][{}]'.format(d, j) + (' * ' + monomial if monomial else '')
+                 for j, monomial in enumerate(monomials)]
+        rows.append(' + '.join(terms))
+    lines.append('    return (' + ',\n            '.join(rows) + ')')
 
-    x_next = c[0] + c[1] * x + c[2] * x * x + c[3] * x * y + c[4] * y + c[5] * y * y
-    y_next = c[6] + c[7] * x + c[8] * x * x + c[9] * x * y + c[10] * y + c[11] * y * y
+    return '\n'.join(lines) + '\n'
 
-    return x_next, y_next
 
+# create polynomial map/flow function f(x, y, c) or f(x, y, z, c) for dim variables up to degree,
+# c holds one row of coefficients per dimension (see get_coefficient_rows),
+# works with scalars as well as with arrays of states and coefficients (batches)
+@functools.lru_cache(maxsize=None)
+def get_polynomial_map(dim, degree):
 
-# calculate coordinates of a cubic map with 20 coefficients (2 dimensions)
-def map_2d_20(x, y, c):
+    name = 'map_{}d_{}'.format(dim, dim * math.comb(dim + degree, degree))
+    namespace = {}
+    exec(compile(get_polynomial_source(name, dim, degree), '<{}>'.format(name), 'exec'), namespace)
 
-    x_next = c[0] + c[1]*x + c[2]*x*x + c[3]*x*x*x + c[4]*x*x*y \
-             + c[5]*x*y + c[6]*x*y*y + c[7]*y + c[8]*y*y + c[9]*y*y*y
-    y_next = c[10] + c[11]*x + c[12]*x*x + c[13]*x*x*x + c[14]*x*x*y \
-             + c[15]*x*y + c[16]*x*y*y + c[17]*y + c[18]*y*y + c[19]*y*y*y
+    return namespace[name]
 
-    return x_next, y_next
 
+# arrange coefficients as coefficient matrix with one row per dimension
+# (a list of lists for single parameter sets, an array of shape (dim, monomials, n) for batches)
+def get_coefficient_rows(c, dim):
 
-# calculate coordinates of a quadratic map/flow with 30 coefficients (3 dimensions)
-def map_3d_30(x, y, z, c):
+    rows = np.reshape(c, (dim, -1) + np.shape(c)[1:])
+    if rows.ndim == 2:
+        return rows.tolist()
 
-    x_next = c[0] + c[1]*x + c[2]*x*x + c[3]*x*y + c[4]*x*z \
-             + c[5]*y + c[6]*y*y + c[7]*y*z + c[8]*z + c[9]*z*z
-    y_next = c[10] + c[11]*x + c[12]*x*x + c[13]*x*y + c[14]*x*z \
-             + c[15]*y + c[16]*y*y + c[17]*y*z + c[18]*z + c[19]*z*z
-    z_next = c[20] + c[21]*x + c[22]*x*x + c[23]*x*y + c[24]*x*z \
-             + c[25]*y + c[26]*y*y + c[27]*y*z + c[28]*z + c[29]*z*z
+    return rows
 
-    return x_next, y_next, z_next
 
+# get all coefficients for parameter string
+def get_coefficient(parameter_string, coefficients):
+    return [coefficients[value] for value in parameter_string]
 
-# calculate coordinates of a cubic map/flow with 60 coefficients (3 dimensions)
-def map_3d_60(x, y, z, c):
 
-    x_next = c[0] + c[1]*x + c[2]*x*x + c[3]*x*x*x + c[4]*x*x*y \
-             + c[5]*x*x*z + c[6]*x*y + c[7]*x*y*y + c[8]*x*y*z + c[9]*x*z \
-             + c[10]*x*z*z + c[11]*y + c[12]*y*y + c[13]*y*y*y + c[14]*y*y*z \
-             + c[15]*y*z + c[16]*y*z*z + c[17]*z + c[18]*z*z + c[19]*z*z*z
-    y_next = c[20] + c[21]*x + c[22]*x*x + c[23]*x*x*x + c[24]*x*x*y \
-             + c[25]*x*x*z + c[26]*x*y + c[27]*x*y*y + c[28]*x*y*z + c[29]*x*z \
-             + c[30]*x*z*z + c[31]*y + c[32]*y*y + c[33]*y*y*y + c[34]*y*y*z \
-             + c[35]*y*z + c[36]*y*z*z + c[37]*z + c[38]*z*z + c[39]*z*z*z
-    z_next = c[40] + c[41]*x + c[42]*x*x + c[43]*x*x*x + c[44]*x*x*y \
-             + c[45]*x*x*z + c[46]*x*y + c[47]*x*y*y + c[48]*x*y*z + c[49]*x*z \
-             + c[50]*x*z*z + c[51]*y + c[52]*y*y + c[53]*y*y*y + c[54]*y*y*z \
-             + c[55]*y*z + c[56]*y*z*z + c[57]*z + c[58]*z*z + c[59]*z*z*z
+# create a random string with n capital letters
+def get_random_string(coefficients, n):
+    return ''.join(random.choice(list(coefficients.keys())) for i in range(n))
 
-    return x_next, y_next, z_next
 
+# create a list of random strings with n capital letters each
+def get_random_strings(coefficients, n, count, rng=None):
+    if rng is None:
+        rng = np.random.default_rng()
+    letters = np.array(list(coefficients.keys()))
+    indices = rng.integers(0, len(letters), size=(count, n))
+    return [''.join(row) for row in letters[indices]]
+
+
+# create the random strings with index start to stop - 1 of the search with given seed,
+# strings are drawn in blocks with independent random streams, so they do not depend on how a search is split up
+def get_seeded_strings(coefficients, n, seed, start, stop, block_size=1000):
+    strings = []
+    for block in range(start // block_size, (stop - 1) // block_size + 1):
+        block_strings = get_random_strings(coefficients, n, block_size, np.random.default_rng([seed, block]))
+        strings += block_strings[max(start - block * block_size, 0):stop - block * block_size]
+    return strings
+
+
+# get parameter string with n letters of an index of the enumeration mode: the letters are the digits of the index
+# in base len(coefficients) (most significant first), index 0 is "AA...A"
+def get_indexed_string(coefficients, n, index):
+    letters = list(coefficients.keys())
+    digits = []
+    for k in range(n):
+        index, digit = divmod(index, len(letters))
+        digits.append(letters[digit])
+    return ''.join(reversed(digits))
 
-# calculate coordinates of a quartic map/flow with 105 coefficients (3 dimensions)
-def map_3d_105(x, y, z, c):
 
-    x_next = c[0] + c[1]*x + c[2]*x*x +c[3]*x*x*x + c[4]*x*x*x*x + c[5]*x*x*x*y \
-             + c[6]*x*x*x*z + c[7]*x*x*y + c[8]*x*x*y*y  + c[9]*x*x*y*z + c[10]*x*x*z \
-             + c[11]*x*x*z*z + c[12]*x*y + c[13]*x*y*y + c[14]*x*y*y*y + c[15]*x*y*y*z \
-             + c[16]*x*y*z + c[17]*x*y*z*z + c[18]*x*z + c[19]*x*z*z + c[20]*x*z*z*z \
-             + c[21]*y + c[22]*y*y + c[23]*y*y*y + c[24]*y*y*y*y + c[25]*y*y*y*z \
-             + c[26]*y*y*z + c[27]*y*y*z*z + c[28]*y*z + c[29]*y*z*z + c[30]*y*z*z*z \
-             + c[31]*z + c[32]*z*z + c[33]*z*z*z + c[34]*z*z*z*z
-    y_next = c[35] + c[36]*x + c[37]*x*x +c[38]*x*x*x + c[39]*x*x*x*x + c[40]*x*x*x*y \
-             + c[41]*x*x*x*z + c[42]*x*x*y + c[43]*x*x*y*y  + c[44]*x*x*y*z + c[45]*x*x*z \
-             + c[46]*x*x*z*z + c[47]*x*y + c[48]*x*y*y + c[49]*x*y*y*y + c[50]*x*y*y*z \
-             + c[51]*x*y*z + c[52]*x*y*z*z + c[53]*x*z + c[54]*x*z*z + c[55]*x*z*z*z \
-             + c[56]*y + c[57]*y*y + c[58]*y*y*y + c[59]*y*y*y*y + c[60]*y*y*y*z \
-             + c[61]*y*y*z + c[62]*y*y*z*z + c[63]*y*z + c[64]*y*z*z + c[65]*y*z*z*z \
-             + c[66]*z + c[67]*z*z + c[68]*z*z*z + c[69]*z*z*z*z
-    z_next = c[70] + c[71]*x + c[72]*x*x +c[73]*x*x*x + c[74]*x*x*x*x + c[75]*x*x*x*y \
-             + c[76]*x*x*x*z + c[77]*x*x*y + c[78]*x*x*y*y  + c[79]*x*x*y*z + c[80]*x*x*z \
-             + c[81]*x*x*z*z + c[82]*x*y + c[83]*x*y*y + c[84]*x*y*y*y + c[85]*x*y*y*z \
-             + c[86]*x*y*z + c[87]*x*y*z*z + c[88]*x*z + c[89]*x*z*z + c[90]*x*z*z*z \
-             + c[91]*y + c[92]*y*y + c[93]*y*y*y + c[94]*y*y*y*y + c[95]*y*y*y*z \
-             + c[96]*y*y*z + c[97]*y*y*z*z + c[98]*y*z + c[99]*y*z*z + c[100]*y*z*z*z \
-             + c[101]*z + c[102]*z*z + c[103]*z*z*z + c[104]*z*z*z*z
+# get index of a parameter string in the enumeration mode (see get_indexed_string)
+def get_string_index(coefficients, parameter_string):
+    letters = list(coefficients.keys())
+    index = 0
+    for letter in parameter_string:
+        index = index * len(letters) + letters.index(letter)
+    return index
 
-    return x_next, y_next, z_next
 
+# create the strings with index start to stop - 1 of the enumeration mode
+def get_indexed_strings(coefficients, n, start, stop):
+    return [get_indexed_string(coefficients, n, index) for index in range(start, stop)]
 
-# get all coefficients for parameter string
-def get_coefficient(parameter_string, coefficients):
-    return [coefficients[value] for value in parameter_string]
 
+# get symmetry group of the parameter strings of map mode m: the map conjugated with a permutation and sign flips
+# of the coordinates (y[d] = signs[d] * x[perm[d]]) is again a polynomial map with the coefficients
+# sign * c[source] (flat indices of the coefficients), so both maps have the same attractor up to the symmetry.
+# return list of (perm, signs, source, sign) starting with the identity, only permutations for symmetry "permute"
+@functools.lru_cache(maxsize=None)
+def get_symmetries(m, symmetry):
+
+    dim = int(m[0])
+    exponents = get_exponent_table(dim, get_map_degree(m))
+    monomials = {tuple(e): j for j, e in enumerate(exponents.tolist())}
+    signs_choices = [(1,) * dim] if symmetry != 'full' else list(itertools.product((1, -1), repeat=dim))
+    perms = list(itertools.permutations(range(dim))) if symmetry != 'none' else [tuple(range(dim))]
+
+    symmetries = []
+    for perm in perms:
+        for signs in signs_choices:
+            source = np.empty(dim * len(exponents), dtype=np.intp)
+            sign = np.empty(dim * len(exponents), dtype=int)
+            for d in range(dim):
+                for j, e in enumerate(exponents):
+                    target = [e[perm[k]] for k in range(dim)]
+                    source[d * len(exponents) + monomials[tuple(target)]] = perm[d] * len(exponents) + j
+                    sign[d * len(exponents) + monomials[tuple(target)]] = \
+                        signs[d] * np.prod([signs[k] ** target[k] for k in range(dim)])
+            symmetries.append((np.array(perm), np.array(signs), source, sign))
+
+    return symmetries
+
+
+# apply symmetry (source, sign) (see get_symmetries) to parameter strings given as letter indices of shape (n, length),
+# negated coefficients mirror the letters around "M" (0.0), return transformed indices and mask of valid results
+# (the negation of "Z" is not a letter)
+def transform_indices(indices, source, sign):
+    transformed = np.where(sign < 0, 2 * get_string_index(coeff, 'M') - indices[:, source], indices[:, source])
+    return transformed, (transformed >= 0).all(axis=1)
+
+
+# check which parameter strings are canonical for the symmetry group of the probe settings (see get_symmetries):
+# a string is canonical if no symmetric string is smaller in alphabetical order, return boolean array
+def check_canonical(parameter_strings, m, symmetry):
+
+    letters = list(coeff.keys())
+    indices = np.array([[letters.index(letter) for letter in string] for string in parameter_strings],
+                       dtype=int).reshape(len(parameter_strings), -1)
+    canonical = np.ones(len(parameter_strings), dtype=bool)
+
+    for perm, signs, source, sign in get_symmetries(m, symmetry)[1:]:
+        transformed, valid = transform_indices(indices, source, sign)
+        differ = transformed != indices
+        first = np.argmax(differ, axis=1)
+        rows = np.arange(len(indices))
+        canonical &= ~(valid & differ.any(axis=1) & (transformed[rows, first] < indices[rows, first]))
+
+    return canonical
+
+
+# get canonical form of a parameter string (smallest symmetric string, see check_canonical),
+# return canonical string and the symmetry (perm, signs) mapping the points of the string to the canonical ones
+def get_canonical(parameter_string, m, symmetry):
+
+    letters = list(coeff.keys())
+    indices = np.array([[letters.index(letter) for letter in parameter_string]])
+    best = (parameter_string, None, None)
+
+    for perm, signs, source, sign in get_symmetries(m, symmetry):
+        transformed, valid = transform_indices(indices, source, sign)
+        string = ''.join(letters[k] for k in transformed[0]) if valid[0] else None
+        if string != None and (best[1] is None or string < best[0]):
+            best = (string, perm, signs)
+
+    return best
+
+
+# skip parameter strings which are not canonical for the symmetry group of the probe settings,
+# count them as rejections of stage "symmetric", return remaining strings
+def skip_symmetric(parameter_strings, m, probe, rejections):
+
+    if probe['symmetry'] == 'none' or len(parameter_strings) == 0:
+        return parameter_strings
+
+    canonical = check_canonical(parameter_strings, m, probe['symmetry'])
+    rejections['symmetric'] += np.count_nonzero(~canonical)
+
+    return [string for string, keep in zip(parameter_strings, canonical) if keep]
+
+
+# get coefficient matrix for a list of parameter strings (one column per string)
+def get_coefficient_matrix(parameter_strings, coefficients):
+    return np.array([get_coefficient(s, coefficients) for s in parameter_strings]).T
+
+
+# import matplotlib on first use (it registers the 3d projection itself since matplotlib 3.2)
+# and select style seaborn (named "seaborn-v0_8" since matplotlib 3.6)
+@functools.lru_cache(maxsize=None)
+def get_pyplot():
+
+    import matplotlib.pyplot as plt
+
+    for style in ('seaborn-v0_8', 'seaborn'):
+        if style in plt.style.available:
+            plt.style.use(style)
+            break
+
+    return plt
+
+
+# get matplotlib figure and axes for scatter plots of dim 2 or 3, created on first use and reused for all plots
+@functools.lru_cache(maxsize=None)
+def get_figure(dim):
+
+    plt = get_pyplot()
+    fig = plt.figure()
+    ax = fig.add_subplot(projection='3d') if dim == 3 else fig.add_subplot()
+
+    return fig, ax
+
+
+# import plotly on first use
+@functools.lru_cache(maxsize=None)
+def get_plotly():
+
+    import plotly
+    import plotly.graph_objs as go
+
+    return plotly, go
+
+
+# import numba on first use, None if it is not installed
+@functools.lru_cache(maxsize=None)
+def get_numba():
+
+    try:
+        import numba
+    except ImportError:
+        return None
+
+    return numba
+
+
+# project 3d points orthographically to the image plane of a camera (elevation and azimuth in degrees)
+def project_points(px, py, pz, elevation=30, azimuth=-60):
+
+    elevation, azimuth = math.radians(elevation), math.radians(azimuth)
+    u = py * math.cos(azimuth) - px * math.sin(azimuth)
+    v = pz * math.cos(elevation) - (px * math.cos(azimuth) + py * math.sin(azimuth)) * math.sin(elevation)
+
+    return u, v
+
+
+# get mapping of points to an image of size x size pixels with equal scale on both axes:
+# (u, v) at the upper left corner and pixels per unit
+def get_image_bounds(u, v, size, margin=0.05):
+
+    u_min, u_max, v_min, v_max = np.min(u), np.max(u), np.min(v), np.max(v)
+    span = max(u_max - u_min, v_max - v_min, 1e-12)
+    scale = size * (1 - 2 * margin) / span
+
+    return ((u_min + u_max) / 2 - size / scale / 2, (v_min + v_max) / 2 + size / scale / 2, scale)
+
+
+# accumulate number of points per pixel into density image, in chunks to limit temporary memory
+def accumulate_density(density, u, v, bounds, chunk_size=1000000):
+
+    height, width = density.shape
+    u_left, v_top, scale = bounds
+
+    for a in range(0, len(u), chunk_size):
+        col = np.floor((u[a:a + chunk_size] - u_left) * scale).astype(np.intp)
+        row = np.floor((v_top - v[a:a + chunk_size]) * scale).astype(np.intp)
+        inside = (col >= 0) & (col < width) & (row >= 0) & (row < height)
+        density += np.bincount(row[inside] * width + col[inside], minlength=width * height).reshape(height, width)
+
+    return density
+
+
+# enlarge mapping of a density image (see get_image_bounds) until it covers all points,
+# every step doubles the covered span around the center and merges the density of 2 x 2 pixels,
+# return the new mapping
+def enlarge_density(density, bounds, u, v):
+
+    size = density.shape[0]
+    u_left, v_top, scale = bounds
+
+    while (np.floor((np.min(u) - u_left) * scale) < 0 or np.floor((np.max(u) - u_left) * scale) >= size or
+           np.floor((v_top - np.max(v)) * scale) < 0 or np.floor((v_top - np.min(v)) * scale) >= size):
+        half = (size + 1) // 2
+        merged = np.zeros((2 * half, 2 * half), dtype=density.dtype)
+        merged[:size, :size] = density
+        merged = merged.reshape(half, 2, half, 2).sum(axis=(1, 3))
+
+        offset = (size - half) // 2
+        density[:] = 0
+        density[offset:offset + half, offset:offset + half] = merged
+        u_left, v_top, scale = u_left - 2 * offset / scale, v_top + 2 * offset / scale, scale / 2
+
+    return u_left, v_top, scale
+
+
+# map density image to rgb image on white background with log or gamma tone mapping
+def tone_map(density, tone='log', gamma=0.5, color=(0x4c, 0x72, 0xb0)):
+
+    peak = density.max()
+    if peak == 0:
+        alpha = np.zeros(density.shape)
+    elif tone == 'log':
+        alpha = np.log1p(density) / math.log1p(peak)
+    else:
+        alpha = (density / peak) ** gamma
+
+    image = 255 - alpha[:, :, None] * (255 - np.array(color, dtype=float))
+
+    return np.round(image).astype(np.uint8)
+
+
+# encode rgb image (array of shape height x width x 3) as png, return bytes
+def encode_png(image, level=6):
+
+    height, width = image.shape[:2]
+    raw = np.hstack([np.zeros((height, 1), dtype=np.uint8), image.reshape(height, -1)])
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)) +
+            chunk(b'IDAT', zlib.compress(raw.tobytes(), level)) + chunk(b'IEND', b''))
 
-# create a random string with n capital letters
-def get_random_string(coefficients, n):
-    return ''.join(random.choice(list(coefficients.keys())) for i in range(n))
 
+# write rgb image (array of shape height x width x 3) to png file
+def write_png(filename, image):
 
-# plot point cloud according to output_mode (png, html, obj)
-def plot_point_cloud(px, py, pz, dim, output_mode, parameter_string, subtitle_string):
+    with open(filename, 'wb') as outfile:
+        outfile.write(encode_png(image))
 
-    # output mode matplotlib
-    if output_mode == 'png':
 
+# render point cloud as density image (3d: projected), return rgb image
+def get_density_image(px, py, pz, dim, render=render_settings):
+
+    u, v = (px, py) if dim == '2d' else project_points(px, py, pz)
+    bounds = get_image_bounds(u, v, render['size'])
+
+    density = np.zeros((render['size'], render['size']), dtype=np.int64)
+    accumulate_density(density, u, v, bounds)
+    return tone_map(density, render['tone'], render['gamma'], render['color'])
+
+
+# render point cloud as density image (3d: projected) and save it as png file
+def render_density(px, py, pz, dim, filename, render=render_settings):
+    write_png(filename, get_density_image(px, py, pz, dim, render))
+
+
+# thin out points of shape (dim, n) to at most budget points preserving the coverage of the attractor:
+# the bounding box is divided into a grid of cells and the first point of every occupied cell is kept
+# (in order of the trajectory), the finest grid with at most budget occupied cells is searched by bisection
+# (starting with the grid of budget cells, stopping within tolerance of the budget)
+def decimate_points(points, budget, tolerance=0.05, max_cells=2**20):
+
+    if budget <= 0 or points.shape[1] <= budget:
+        return points
+
+    lower = points.min(axis=1)
+    extent = points.max(axis=1) - lower
+    extent[extent == 0] = 1
+    scaled = (points - lower[:, None]) / extent[:, None]
+
+    # indices of the first points of the occupied cells of a grid with cells per axis
+    def select(cells):
+        index = np.minimum((scaled * cells).astype(np.int64), cells - 1)
+        keys = index[0]
+        for k in range(1, len(index)):
+            keys = keys * cells + index[k]
+        return np.sort(np.unique(keys, return_index=True)[1])
+
+    low = max(int(budget ** (1 / len(points))), 1)
+    selected = select(low)
+    while len(selected) > budget and low > 1:
+        low //= 2
+        selected = select(low)
+
+    high = 2 * low
+    while high <= max_cells and len(selected) < (1 - tolerance) * budget:
+        kept = select(high)
+        if len(kept) > budget:
+            break
+        low, high, selected = high, 2 * high, kept
+
+    while high - low > 1 and high <= max_cells and len(selected) < (1 - tolerance) * budget:
+        middle = (low + high) // 2
+        kept = select(middle)
+        if len(kept) > budget:
+            high = middle
+        else:
+            low, selected = middle, kept
+
+    return points[:, selected]
+
+
+# plot point cloud according to output_mode (png, html, frames, obj, ply, npy), return name of the output file
+def plot_point_cloud(px, py, pz, dim, output_mode, parameter_string, subtitle_string, render=render_settings):
+
+    # output mode density image
+    if output_mode == 'png' and render['renderer'] == 'density':
+
+        filename = '{} Attractor {} {} Vertices.png'.format(dim.upper(), parameter_string, len(px))
+        render_density(px, py, pz, dim, filename, render)
+        print('attractor {} saved to .png file ({} vertices)'.format(parameter_string, len(px)))
+
+    # output mode matplotlib, the figure is reused (see get_figure)
+    elif output_mode == 'png':
+
+        filename = '{} Attractor {} {} Vertices.png'.format(dim.upper(), parameter_string, len(px))
+        fig, ax = get_figure(int(dim[0]))
+        ax.cla()
         if dim == '2d':
-            plt.scatter(px, py, c='#4c72b0', marker='.', s=0.1)
-            plt.xlabel('x')
-            plt.ylabel('y')
-            plt.title('2D Attractor {}\n{}'.format(parameter_string, subtitle_string))
-            plt.savefig('2D Attractor {} {} Vertices.png'.format(parameter_string, len(px)))
+            ax.scatter(px, py, c='#4c72b0', marker='.', s=0.1)
+            ax.set_xlabel('x')
+            ax.set_ylabel('y')
+            ax.set_title('2D Attractor {}\n{}'.format(parameter_string, subtitle_string))
 
         elif dim == '3d':
-            fig = plt.figure()
-            ax = fig.gca(projection='3d')
             ax.scatter(px, py, pz, s=0.1)
             ax.set_xlabel('x')
             ax.set_ylabel('y')
             ax.set_zlabel('z')
             ax.set_title('3D Attractor {}\n{}'.format(parameter_string, subtitle_string))
-            plt.savefig('3D Attractor {} {} Vertices.png'.format(parameter_string, len(px)))
-            
-        plt.close('all')    
+
+        fig.savefig(filename)
+        ax.cla()
         print('attractor {} saved to .png file ({} vertices)'.format(parameter_string, len(px)))
 
     # output mode plotly
     elif output_mode =='html':
 
+        plotly, go = get_plotly()
+        count = len(px)
+        points = decimate_points(np.array([px, py, pz] if dim == '3d' else [px, py], dtype=float), render['budget'])
+        include_plotlyjs = {'directory': 'directory', 'cdn': 'cdn', 'inline': True}[render['plotlyjs']]
+        filename = '{} Attractor {} {} Vertices.html'.format(dim.upper(), parameter_string, count)
+
         if dim == '2d':
 
-            trace = go.Scatter(x=px, y=py, mode='markers', marker=dict(size=1, colorscale='Viridis', opacity=1.0))
+            # webgl trace
+            trace = go.Scattergl(x=points[0], y=points[1], mode='markers',
+                                 marker=dict(size=1, colorscale='Viridis', opacity=1.0))
             layout = go.Layout(margin=dict(l=0, r=0, b=0, t=0))
             fig = go.Figure(data=[trace], layout=layout)
-            plotly.offline.plot(fig, auto_open=False, filename='2D Attractor {} {} Vertices.html'.format(parameter_string, len(px)))
+            plotly.offline.plot(fig, auto_open=False, include_plotlyjs=include_plotlyjs, filename=filename)
 
         elif dim=='3d':
 
-            trace = go.Scatter3d(x=px, y=py, z=pz, marker=dict(size=1, colorscale='Viridis', opacity=1.0), line=dict(color='#1f77b4', width=1))
+            trace = go.Scatter3d(x=points[0], y=points[1], z=points[2],
+                                 marker=dict(size=1, colorscale='Viridis', opacity=1.0), line=dict(color='#1f77b4', width=1))
             layout = go.Layout(margin=dict(l=0, r=0, b=0, t=0))
             fig = go.Figure(data=[trace], layout=layout)
-            plotly.offline.plot(fig, auto_open=False, filename='3D Attractor {} {} Vertices.html'.format(parameter_string, len(px)))
+            plotly.offline.plot(fig, auto_open=False, include_plotlyjs=include_plotlyjs, filename=filename)
 
-        print('attractor {} saved to .html file ({} vertices)'.format(parameter_string, len(px)))
+        if points.shape[1] < count:
+            print('attractor {} saved to .html file ({} of {} vertices)'.format(parameter_string, points.shape[1], count))
+        else:
+            print('attractor {} saved to .html file ({} vertices)'.format(parameter_string, count))
         
-    # output mode wavefront
-    elif output_mode == 'obj':
+    # output modes animation frames, wavefront, binary ply and numpy array (see get_sinks)
+    elif output_mode in ('frames', 'obj', 'ply', 'npy'):
 
-        if dim == '2d':
-            
-            with open("{}.obj".format(parameter_string), "w") as outfile:
-                outfile.write("o attractor\n")
-                for i in range(len(px)):
-                    outfile.write("v {} {} {}\n".format(px[i], py[i], 0))
-                    
-        elif dim=='3d':
-            
-            with open("{}.obj".format(parameter_string), "w") as outfile:
-                outfile.write("o attractor\n")
-                for i in range(len(px)):
-                    outfile.write("v {} {} {}\n".format(px[i]*10, py[i]*10, pz[i]*10))
-                
-        print('attractor {} saved to .obj file ({} vertices)'.format(parameter_string, len(px)))
-
-
-# check for fixed points and oscillation
-def check_histogram(dim, x, y, z, parameter_string, threshold=50):
-
-    if dim == 3:
-
-        lastx = np.round(x, 3)
-        lasty = np.round(y, 3)
-        lastz = np.round(z, 3)
-        histx, binx = np.histogram(lastx, len(lastx))
-        histy, biny = np.histogram(lasty, len(lasty))
-        histz, binz = np.histogram(lastz, len(lastz))
-        diff_valx = np.greater(histx, 0).astype(int).sum()
-        diff_valy = np.greater(histy, 0).astype(int).sum()
-        diff_valz = np.greater(histz, 0).astype(int).sum()
-
-        if diff_valx < threshold and diff_valy < threshold and diff_valz < threshold:
-            print('attractor {} low diversity of last {} points: x[{}] y[{}] z[{}]'\
-                .format(parameter_string, len(x), diff_valx, diff_valy, diff_valz))
-
-            return False
-
-    elif dim == 2:
-
-        lastx = np.round(x, 3)
-        lasty = np.round(y, 3)
-        histx, binx = np.histogram(lastx, len(lastx))
-        histy, biny = np.histogram(lasty, len(lasty))
-        diff_valx = np.greater(histx, 0).astype(int).sum()
-        diff_valy = np.greater(histy, 0).astype(int).sum()
-
-        if diff_valx < threshold and diff_valy < threshold:
-            print('attractor {} low diversity of last {} points: x[{}] y[{}]'\
-                .format(parameter_string, len(x), diff_valx, diff_valy))
-                
-            return False
+        sink, = get_sinks(int(dim[0]), [output_mode], parameter_string, subtitle_string, render)
+        sink.write(np.array([px, py, pz][:int(dim[0])], dtype=float))
+        sink.close()
+        filename = sink.filename
+
+    return filename
+
+
+# count different values of the coordinates x, y (and z for dim 3) rounded to 3 decimals,
+# with the compiled kernel of the numba backend if kernels are given (see get_kernels)
+def count_diversity(dim, x, y, z, kernels=None):
+
+    counts = []
+    for values in (x, y, z)[:dim]:
+        if kernels != None:
+            counts.append(int(kernels['diversity'](values, 3)))
+            continue
+        hist, bins = np.histogram(np.round(values, 3), len(values))
+        counts.append(int(np.greater(hist, 0).astype(int).sum()))
+
+    return counts
+
+
+# check number of different values of length points for fixed points and oscillation,
+# return reason of rejection or None
+def check_diversity(counts, length, threshold=50):
+
+    if all(count < threshold for count in counts):
+        return 'low diversity of last {} points: {}'\
+            .format(length, ' '.join('{}[{}]'.format(axis, count) for axis, count in zip('xyz', counts)))
+
+    return None
+
+
+# count pairs of points of shape (dim, n) closer than each of the increasing radii: the points are sorted into
+# a grid with cells of the largest radius, only the pairs of neighboring cells are compared
+def count_pairs(points, radii):
+
+    dim, n = points.shape
+    cells = np.floor((points - points.min(axis=1)[:, None]) / radii[-1]).astype(np.intp) + 1
+    shape = tuple(cells.max(axis=1) + 2)
+    keys = np.ravel_multi_index(tuple(cells), shape)
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+    strides = np.cumprod((1,) + shape[:0:-1])[::-1]
+
+    counts = np.zeros(len(radii), dtype=np.int64)
+    for offset in itertools.product((-1, 0, 1), repeat=dim):
+
+        # pairs (i, j) of every point i with the points j of the neighboring cell, ordered by cell
+        neighbors = keys + int(np.dot(offset, strides))
+        lower = np.searchsorted(sorted_keys, neighbors, 'left')
+        length = np.searchsorted(sorted_keys, neighbors, 'right') - lower
+        i = np.repeat(np.arange(n), length)
+        j = order[np.arange(length.sum()) + np.repeat(lower - (np.cumsum(length) - length), length)]
+
+        squares = sum((values[i] - values[j])**2 for values in points)
+        counts += [np.count_nonzero(squares < radius**2) for radius in radii]
+
+    # every pair is counted twice, every point once with itself
+    return (counts - n) // 2
+
+
+# get priorities of the points with the given indices for the reservoir sample: a hash of index and seed
+# (bijective, so the priorities of different points differ)
+def get_priorities(indices, seed):
+
+    z = indices.astype(np.uint64) + np.uint64(seed * 0x9e3779b97f4a7c15 % 2**64)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+    return z ^ (z >> np.uint64(31))
+
+
+# streaming quality statistics of the points of an attractor, updated chunk by chunk in constant time per point:
+# occupied cells of a fixed grid (placed around the probe points, twice as large as their bounding box, points
+# before the grid is placed are kept until then, points outside are only counted) and a uniform sample of all
+# points for the correlation dimension (the points with the smallest priorities, see get_priorities). both are
+# independent of the chunks, the occupied cells are also recorded when mark points are sorted into the grid
+class Quality:
+
+    def __init__(self, dim, settings=quality_settings, seed=0, mark=None):
+        self.settings = settings
+        self.size = max(int(round(settings['cells'] ** (1 / dim))), 1)
+        self.grid = None
+        self.buffer = []
+        self.sample = np.empty((dim, settings['sample']))
+        self.priorities = np.empty(settings['sample'], dtype=np.uint64)
+        self.seed = seed
+        self.count = 0
+        self.placed = 0
+        self.outside = 0
+        self.mark = mark
+        self.marked = None
+        self.estimate = None
+
+    # place the grid around the bounding box from lower to upper and sort the kept points into it
+    def place(self, lower, upper):
+
+        span = 2 * max(float(np.max(upper - lower)), 1e-9)
+        self.lower = (lower + upper) / 2 - span / 2
+        self.scale = self.size / span
+        self.grid = np.zeros((self.size,) * len(lower), dtype=bool)
+        for points in self.buffer:
+            self.occupy(points)
+        self.buffer = []
+
+    # add points with indices first, first + 1, ...
+    def update(self, points, first):
+
+        n = points.shape[1]
+        if n == 0:
+            return
+
+        if self.grid is None:
+            self.buffer.append(points.copy())
+        else:
+            self.occupy(points)
+
+        # sample: the points with the smallest priorities so far
+        size = self.sample.shape[1]
+        priorities = get_priorities(first + np.arange(n), self.seed)
+        filled = min(self.count, size)
+        if filled == size:
+            candidates = np.flatnonzero(priorities < self.priorities.max())
+            points, priorities = points[:, candidates], priorities[candidates]
+        merged = np.concatenate([self.priorities[:filled], priorities])
+        keep = np.argpartition(merged, size - 1)[:size] if len(merged) > size else np.arange(len(merged))
+        self.sample[:, :len(keep)] = np.concatenate([self.sample[:, :filled], points], axis=1)[:, keep]
+        self.priorities[:len(keep)] = merged[keep]
+        self.count += n
+        self.estimate = None
+
+    # sort points into the grid, record the occupied cells after mark points
+    def occupy(self, points):
+
+        if self.mark != None and self.marked is None and self.placed + points.shape[1] >= self.mark:
+            split = self.mark - self.placed
+            self.fill(points[:, :split])
+            self.marked = self.cells()
+            points = points[:, split:]
+        self.fill(points)
+
+    def fill(self, points):
+
+        cells = np.floor((points - self.lower[:, None]) * self.scale).astype(np.intp)
+        inside = ((cells >= 0) & (cells < self.size)).all(axis=0)
+        self.outside += points.shape[1] - int(np.count_nonzero(inside))
+        self.grid[tuple(cells[:, inside])] = True
+        self.placed += points.shape[1]
+
+    def cells(self):
+        return int(np.count_nonzero(self.grid)) if self.grid is not None else 0
+
+    # estimate correlation dimension of the sample: slope of the logarithm of the number of pairs closer than r
+    # over the logarithm of r (least squares, radii with less than min_pairs pairs are too noisy and skipped),
+    # the estimate is kept until the next update
+    def dimension(self, min_pairs=10):
+        if self.estimate is None:
+            self.estimate = (self.estimate_dimension(min_pairs),)
+        return self.estimate[0]
+
+    def estimate_dimension(self, min_pairs):
+
+        sample = self.sample[:, :min(self.count, self.sample.shape[1])]
+        n = sample.shape[1]
+        extent = float(np.max(sample.max(axis=1) - sample.min(axis=1))) if n > 1 else 0.0
+        if extent == 0:
+            return None
+
+        radii = extent * np.geomspace(*self.settings['radii'], self.settings['steps'])
+        pairs = count_pairs(sample, radii)
+        valid = pairs >= min_pairs
+        if np.count_nonzero(valid) < 2:
+            return None
+
+        return float(np.polyfit(np.log(radii[valid]), np.log(pairs[valid]), 1)[0])
+
+    def summary(self):
+        return {'points': self.count, 'cells': self.cells(), 'outside': self.outside, 'dimension': self.dimension()}
+
+
+# check number of occupied cells and correlation dimension of the quality statistics of an attractor,
+# return reason of rejection or None. cells are tested after 10 points per required cell (the mark of the
+# statistics, see track_quality) and for complete statistics, the dimension only for complete statistics
+def check_quality(quality, probe, complete=False):
+
+    if probe['cells'] != None and (complete or quality.marked != None):
+        cells, count = (quality.marked, quality.mark) if quality.marked != None else (quality.cells(), quality.count)
+        if cells < probe['cells']:
+            return 'degenerate after {} points: {} occupied cells'.format(count, cells)
+
+    if probe['dimension'] != None and complete:
+        dimension = quality.dimension()
+        if dimension is None or dimension < probe['dimension']:
+            return 'degenerate after {} points: correlation dimension {}'.format(
+                quality.count, 'unknown' if dimension is None else '{:.3f}'.format(dimension))
+
+    return None
+
+
+# update the quality statistics of an attractor with chunks (index of first point, points) of the points
+# from index plot_offset while passing the chunks on (see Quality), reject the attractor as soon as it degenerates
+# (see check_quality) and store the statistics of a complete trajectory in info['quality']: number of points,
+# occupied cells, points outside the grid and correlation dimension (or None). the grid is placed around the points
+# of the probe (probe length iterations from the first chunk) and the sample is seeded with the parameter string,
+# so the statistics do not depend on the chunk size or on the cache
+def track_quality(chunks, info, dim, plot_offset, parameter_string, probe=probe_settings, settings=quality_settings):
+
+    quality = Quality(dim, settings, zlib.crc32(parameter_string.encode()),
+                      10 * probe['cells'] if probe['cells'] != None else None)
+    info['quality'] = None
+    stop = None
+    lower, upper = None, None
+
+    for start, points in chunks:
+        with profiler.stage('quality'):
+
+            # bounding box of the probe points, place the grid after them
+            if quality.grid is None:
+                stop = start + probe['length'] + 1 if stop is None else stop
+                box = points[:, :max(stop - start, 0)]
+                if box.shape[1] > 0:
+                    lower = box.min(axis=1) if lower is None else np.minimum(lower, box.min(axis=1))
+                    upper = box.max(axis=1) if upper is None else np.maximum(upper, box.max(axis=1))
+                if start + points.shape[1] >= stop:
+                    quality.place(lower, upper)
+
+            quality.update(points[:, max(plot_offset - start, 0):], max(plot_offset, start))
+            reason = check_quality(quality, probe)
+        if reason != None:
+            info['reason'] = ('quality', reason)
+            profiler.reject('quality', start + points.shape[1])
+            chunks.close()
+            return
+        yield start, points
+
+    if info['reason'] != None:
+        return
+
+    with profiler.stage('quality'):
+        if quality.grid is None and lower is not None:
+            quality.place(lower, upper)
+        reason = check_quality(quality, probe, True)
+        info['quality'] = quality.summary()
+    if reason != None:
+        info['reason'] = ('quality', reason)
+        profiler.reject('quality', plot_offset + quality.count)
+
+
+# advance the estimate of the largest lyapunov exponent from points[:, start] to points[:, stop]:
+# a shadow trajectory is iterated next to the points and renormalized to distance every interval iterations,
+# return sum of the logarithmic stretching factors and direction of separation
+def track_lyapunov(points, start, stop, c, map_function, time, iterate, direction, distance=1e-8, interval=10):
+
+    total = 0.0
+    shadow = get_shadow_buffer(len(points), interval)
+
+    for a in range(start, stop, interval):
+        b = min(a + interval, stop)
+
+        shadow[:, 0] = points[:, a] + distance * direction
+        iterate(shadow, 0, b - a, c, map_function, time, math.inf)
+
+        delta = shadow[:, b - a] - points[:, b]
+        separation = math.sqrt(sum(d * d for d in delta.tolist()))
+
+        # separation vanished (contraction below rounding) or shadow escaped
+        if not 0 < separation < math.inf:
+            total += math.log(distance) if separation == 0 else math.log(1 / distance)
+            continue
+
+        total += math.log(separation / distance)
+        direction = delta / separation
+
+    return total, direction
+
+
+# get reusable buffer for the shadow trajectory of the lyapunov estimate
+@functools.lru_cache(maxsize=None)
+def get_shadow_buffer(dim, interval):
+    return np.empty((dim, interval + 1))
+
+
+# detect periodic orbits with brent's algorithm on states rounded to decimals (constant memory),
+# check points[:, start + 1] to points[:, stop] and return period (or None) and state of the algorithm,
+# column 0 of points holds the point with index offset
+def detect_cycle(points, start, stop, decimals, state, offset=0):
+
+    tortoise, index, power = state
+    k = start + 1
+
+    while k <= stop:
+        end = min(stop, index + power)
+        rounded = np.round(points[:, k - offset:end - offset + 1], decimals)
+
+        matches = np.flatnonzero(np.all(rounded == tortoise[:, None], axis=0))
+        if len(matches) > 0:
+            return k + matches[0] - index, (tortoise, index, power)
+
+        # move tortoise to hare at powers of two
+        if end == index + power:
+            tortoise, index, power = rounded[:, -1], end, 2 * power
+
+        k = end + 1
+
+    return None, (tortoise, index, power)
+
+
+# search a batch of attractors at once with the bounds and diversity tests of the probe stage
+# (see generate_attractor), return the parameter strings surviving the probe and the number of rejections per stage,
+# parameter strings and info of rejected attractors are appended to outcomes (see get_outcome).
+# once fewer candidates than the fallback of the backend are left (see batch_settings), they leave the batch
+# untested and are returned as survivors, too. the probe points of the tested survivors (shape (dim, length + 1))
+# are stored in trajectories by parameter string, so their full iteration continues them (see generate_attractor)
+def search_batch(parameter_strings, dim, time, num_iterations, map_function, probe=probe_settings, outcomes=None,
+                 trajectories=None):
+
+    if len(parameter_strings) == 0:
+        return [], collections.Counter()
+
+    with profiler.stage('coefficients'):
+        c = get_coefficient_rows(get_coefficient_matrix(parameter_strings, coeff), dim)
+    kernels = get_kernels(probe['backend'])
+    profiler.count('probed', len(parameter_strings))
+    alive = np.arange(len(parameter_strings))
+    rejections = collections.Counter()
 
-    return True
+    length = min(probe['length'], num_iterations)
+    first = length - probe['window'] + 1
+    fallback = batch_settings['fallback']['rk45' if time != None and probe['integrator'] == 'rk45'
+                                          else get_backend(probe)]
+    untested = alive[:0]
 
+    # initialize start values, window of last points for histogram check and states of the candidates in bounds
+    # after every iteration (with their indices), so only the probe points of the survivors are stored
+    state = [np.full(len(alive), start_value) for k in range(dim)]
+    window = np.empty((dim, probe['window'], len(alive)))
+    history = [] if trajectories != None else None
 
-# search and plot 2d attractor
-def get_attractor_2d_map(parameter_string, num_points, subtitle_string, output_modes, sieve, plot_offset, map_function):
+    # advance all candidates simultaneously
+    with profiler.stage('iteration'):
+        for i in range(length):
 
-    x = np.empty(num_points + plot_offset)
-    y = np.empty(num_points + plot_offset)
+            if time != None:
+                new_state = step_flow(state, c, map_function, time, probe)
+            else:
+                new_state = map_function(*state, c)
+
+            # values out of bounds -> drop candidates
+            inside = np.ones(len(alive), dtype=bool)
+            for values in new_state:
+                inside &= np.abs(values) <= probe['bound']
+
+            if i + 1 >= first:
+                for k in range(dim):
+                    window[k, i + 1 - first] = new_state[k]
+
+            rejections['bounds'] += np.count_nonzero(~inside)
+            if not inside.all():
+                profiler.reject('bounds', i, np.count_nonzero(~inside))
+                if outcomes != None:
+                    outcomes.extend((parameter_strings[k], {'reason': ('bounds',
+                                                                       'out of bounds at iteration {}'.format(i)),
+                                                            'iteration': i}) for k in alive[~inside])
+                alive = alive[inside]
+                c = c[..., inside]
+                new_state = [values[inside] for values in new_state]
+                window = window[:, :, inside]
+
+            if history is not None:
+                history.append((alive, new_state))
+            state = new_state
+            if len(alive) == 0:
+                break
+
+            # few candidates left: probing them one by one is faster than further batch steps
+            if len(alive) < fallback and i + 1 < length:
+                untested, alive = alive, alive[:0]
+                break
+
+    # test diversity of remaining candidates
+    if length == probe['length'] and len(alive) > 0:
+        keep = np.ones(len(alive), dtype=bool)
+        with profiler.stage('diversity'):
+            for k in range(len(alive)):
+                counts = count_diversity(dim, window[0, :, k], window[1, :, k], window[-1, :, k], kernels)
+                reason = check_diversity(counts, probe['window'], probe['threshold'])
+                if reason != None:
+                    keep[k] = False
+                    if outcomes != None:
+                        outcomes.append((parameter_strings[alive[k]], {'reason': ('diversity', reason),
+                                                                       'diversity': counts}))
+
+        rejections['diversity'] += np.count_nonzero(~keep)
+        profiler.reject('diversity', length, np.count_nonzero(~keep))
+        alive = alive[keep]
+
+    # probe points of the tested survivors (they stayed in bounds for the whole probe)
+    if history is not None and len(alive) > 0:
+        points = np.empty((dim, length + 1, len(alive)))
+        points[:, 0] = start_value
+        for i, (indices, values) in enumerate(history):
+            position = np.searchsorted(indices, alive)
+            for k in range(dim):
+                points[k, i + 1] = values[k][position]
+        for j, k in enumerate(alive):
+            trajectories[parameter_strings[k]] = points[:, :, j].copy()
+    survivors = [parameter_strings[k] for k in np.sort(np.concatenate([untested, alive]))]
+
+    return survivors, rejections
+
+
+# iterate 2d map from index start to stop, return iteration out of bounds or None
+def iterate_2d_map(points, start, stop, c, map_function, time, bound):
+
+    x, y = points
+    x_new, y_new = float(x[start]), float(y[start])
+
+    for i in range(start, stop):
+
+        x_cur, y_cur = x_new, y_new
+        x_new, y_new = map_function(x_cur, y_cur, c)
 
-    c = get_coefficient(parameter_string, coeff)
+        x[i + 1], y[i + 1] = x_new, y_new
 
-    # initialize start values
-    x[0], y[0] = 0.1, 0.1
+        # values out of bounds -> abort
+        if abs(x_new) > bound or abs(y_new) > bound:
+            return i
 
-    # calculate all x and y coordinates
-    for i in range(num_points + plot_offset - 1):
+    return None
 
-        x_cur, y_cur = x[i], y[i]
-        x_new, y_new = map_function(x_cur, y_cur, c)
 
-        x[i + 1], y[i + 1] = x_new, y_new
+# iterate 3d map from index start to stop, return iteration out of bounds or None
+def iterate_3d_map(points, start, stop, c, map_function, time, bound):
 
-        # values out of bounds -> abort
-        if abs(x_new) > 10 or abs(y_new) > 10:
-            print('attractor', parameter_string, 'out of bounds at iteration', i, '-', x_new, y_new)
-            return False
+    x, y, z = points
+    x_new, y_new, z_new = float(x[start]), float(y[start]), float(z[start])
 
-        # check histogram of points at index 100 to 199
-        if i == 300:
-            if check_histogram(2, x[i-100:i], y[i-100:i], 0, parameter_string) == False:
-                return False
+    for i in range(start, stop):
 
-    # plot 2d attractor            
-    for output_mode in output_modes:
-        plot_point_cloud(x[plot_offset::sieve],
-                        y[plot_offset::sieve],
-                        0,
-                        '2d',
-                        output_mode,
-                        parameter_string,
-                        subtitle_string)
+        x_cur, y_cur, z_cur = x_new, y_new, z_new
+        x_new, y_new, z_new = map_function(x_cur, y_cur, z_cur, c)
 
-    # return success
-    return True
+        x[i + 1], y[i + 1], z[i + 1] = x_new, y_new, z_new
 
+        # values out of bounds -> abort
+        if abs(x_new) > bound or abs(y_new) > bound or abs(z_new) > bound:
+            return i
 
-# search and plot 3d attractor flow mode
-def get_attractor_3d_flow(parameter_string, time, num_points, subtitle_string, output_modes, sieve, plot_offset, map_function, interpolate):
+    return None
 
-    x = np.empty(num_points + plot_offset)
-    y = np.empty(num_points + plot_offset)
-    z = np.empty(num_points + plot_offset)
 
-    c = get_coefficient(parameter_string, coeff)
+# iterate 3d flow (explicit euler steps) from index start to stop, return iteration out of bounds or None
+def iterate_3d_flow(points, start, stop, c, map_function, time, bound):
 
-    # initialize start values
-    x[0], y[0], z[0] = 0.1, 0.1, 0.1
+    x, y, z = points
+    x_new, y_new, z_new = float(x[start]), float(y[start]), float(z[start])
 
-    # calculate all x and y coordinates
-    for i in range(num_points + plot_offset - 1):
+    for i in range(start, stop):
 
-        x_cur, y_cur, z_cur = x[i], y[i], z[i]
+        x_cur, y_cur, z_cur = x_new, y_new, z_new
         x_new, y_new, z_new = map_function(x_cur, y_cur, z_cur, c)
         x_new = x_cur + time*x_new
         y_new = y_cur + time*y_new
@@ -337,122 +1234,1107 @@ def get_attractor_3d_flow(parameter_string, time, num_points, subtitle_string, o
         x[i + 1], y[i + 1], z[i + 1] = x_new, y_new, z_new
 
         # values out of bounds -> abort
-        if abs(x_new) > 10 or abs(y_new) > 10 or abs(z_new) > 10:
-            print('attractor', parameter_string, 'out of bounds at iteration', i, '-', x_new, y_new, z_new)
-            return False
+        if abs(x_new) > bound or abs(y_new) > bound or abs(z_new) > bound:
+            return i
 
-        # check histogram of points at index 100 to 199
-        if i == 300:
-            if check_histogram(3, x[i-100:i], y[i-100:i], z[i-100:i], parameter_string) == False:
-                return False
+    return None
 
-    t = np.arange(num_points + plot_offset)
-    
-    # now let's refine it to 100 points:
-    t2 = np.linspace(t.min(), t.max(), num_points*interpolate + plot_offset)  
 
-    x2 = InterpolatedUnivariateSpline(t, x)(t2)
-    y2 = InterpolatedUnivariateSpline(t, y)(t2)
-    z2 = InterpolatedUnivariateSpline(t, z)(t2)
-    
-    # plot 3d attractor
-    for output_mode in output_modes:
-        plot_point_cloud(x2[plot_offset::sieve],
-                        y2[plot_offset::sieve],
-                        z2[plot_offset::sieve],
-                        '3d',
-                        output_mode,
-                        parameter_string,
-                        subtitle_string)
+# iterate 3d flow (classical runge-kutta method, rk4) from index start to stop, return iteration out of bounds or None
+def iterate_3d_flow_rk4(points, start, stop, c, map_function, time, bound):
 
-    # return success
-    return True
+    x, y, z = points
+    x_new, y_new, z_new = float(x[start]), float(y[start]), float(z[start])
+    half = time / 2
 
+    for i in range(start, stop):
 
-# search and plot 3d attractor map mode
-def get_attractor_3d_map(parameter_string, num_points, subtitle_string, output_modes, sieve, plot_offset, map_function):
+        x_cur, y_cur, z_cur = x_new, y_new, z_new
+        x1, y1, z1 = map_function(x_cur, y_cur, z_cur, c)
+        x2, y2, z2 = map_function(x_cur + half*x1, y_cur + half*y1, z_cur + half*z1, c)
+        x3, y3, z3 = map_function(x_cur + half*x2, y_cur + half*y2, z_cur + half*z2, c)
+        x4, y4, z4 = map_function(x_cur + time*x3, y_cur + time*y3, z_cur + time*z3, c)
+        x_new = x_cur + time/6*(x1 + 2*x2 + 2*x3 + x4)
+        y_new = y_cur + time/6*(y1 + 2*y2 + 2*y3 + y4)
+        z_new = z_cur + time/6*(z1 + 2*z2 + 2*z3 + z4)
 
-    x = np.empty(num_points + plot_offset)
-    y = np.empty(num_points + plot_offset)
-    z = np.empty(num_points + plot_offset)
+        x[i + 1], y[i + 1], z[i + 1] = x_new, y_new, z_new
 
-    c = get_coefficient(parameter_string, coeff)
+        # values out of bounds -> abort
+        if abs(x_new) > bound or abs(y_new) > bound or abs(z_new) > bound:
+            return i
 
-    # initialize start values
-    x[0], y[0], z[0] = 0.1, 0.1, 0.1
+    return None
 
-    # calculate all x and y coordinates
-    for i in range(num_points + plot_offset - 1):
 
-        x_cur, y_cur, z_cur = x[i], y[i], z[i]
-        x_new, y_new, z_new = map_function(x_cur, y_cur, z_cur, c)
+# coefficients of the dormand-prince method (rk45): one row of weights of the slopes per stage
+# (the last stage is the solution of 5th order) and weights of the error estimate
+dopri_stages = [[1/5],
+                [3/40, 9/40],
+                [44/45, -56/15, 32/9],
+                [19372/6561, -25360/2187, 64448/6561, -212/729],
+                [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+                [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84]]
+dopri_error = [71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40]
 
-        x[i + 1], y[i + 1], z[i + 1] = x_new, y_new, z_new
+
+# advance state (list of coordinates, floats or arrays of a batch) of a flow by one dormand-prince step of size h,
+# return new state (5th order) and error estimate per coordinate
+def dormand_prince_step(state, c, map_function, h):
+
+    slopes = [map_function(*state, c)]
+    for weights in dopri_stages:
+        stage = [value + h*sum(w*slope[k] for w, slope in zip(weights, slopes) if w) for k, value in enumerate(state)]
+        slopes.append(map_function(*stage, c))
+
+    error = [h*sum(w*slope[k] for w, slope in zip(dopri_error, slopes) if w) for k in range(len(state))]
+
+    return stage, error
+
+
+# get norm of the error estimate of a step from state to new_state relative to the tolerance (absolute and relative)
+def get_error_norm(error, state, new_state, tolerance):
+    return math.sqrt(sum((e / (tolerance * (1 + max(abs(s), abs(n)))))**2
+                         for e, s, n in zip(error, state, new_state)) / len(state))
+
+
+# iterate 3d flow (adaptive dormand-prince method, rk45) from index start to stop: every time interval is integrated
+# with steps controlled by the tolerance, starting with a single step for the whole interval (independent of the
+# previous intervals), return iteration out of bounds (or without convergence of the step size) or None
+def iterate_3d_flow_rk45(points, start, stop, c, map_function, time, bound, tolerance=1e-6):
+
+    x, y, z = points
+    state = [float(x[start]), float(y[start]), float(z[start])]
+
+    for i in range(start, stop):
+
+        remaining, h = time, time
+        while remaining > 0:
+            last = h >= remaining
+            if last:
+                h = remaining
+
+            new_state, error = dormand_prince_step(state, c, map_function, h)
+            norm = get_error_norm(error, state, new_state, tolerance)
+
+            # reject step (the error of diverging states is not finite)
+            if not norm <= 1:
+                h *= max(0.2, 0.9 * norm**-0.2) if math.isfinite(norm) else 0.2
+                if h < time * 1e-12:
+                    return i
+                continue
+
+            state = new_state
+            remaining = 0 if last else remaining - h
+            h *= min(5, 0.9 * norm**-0.2) if norm > 0 else 5
+
+        x[i + 1], y[i + 1], z[i + 1] = state
 
         # values out of bounds -> abort
-        if abs(x_new) > 10 or abs(y_new) > 10 or abs(z_new) > 10:
-            print('attractor', parameter_string, 'out of bounds at iteration', i, '-', x_new, y_new, z_new)
-            return False
+        if abs(state[0]) > bound or abs(state[1]) > bound or abs(state[2]) > bound:
+            return i
+
+    return None
+
+
+# advance states of a batch of flows (list of coordinates as arrays) by one time interval
+# with the integrator of the probe settings (see iterate_3d_flow, iterate_3d_flow_rk4 and iterate_3d_flow_rk45)
+def step_flow(state, c, map_function, time, probe=probe_settings):
+
+    if probe['integrator'] == 'euler':
+        return [cur + time*new for cur, new in zip(state, map_function(*state, c))]
+
+    if probe['integrator'] == 'rk4':
+        k1 = map_function(*state, c)
+        k2 = map_function(*[cur + time/2*k for cur, k in zip(state, k1)], c)
+        k3 = map_function(*[cur + time/2*k for cur, k in zip(state, k2)], c)
+        k4 = map_function(*[cur + time*k for cur, k in zip(state, k3)], c)
+        return [cur + time/6*(a + 2*b + 2*d + e) for cur, a, b, d, e in zip(state, k1, k2, k3, k4)]
+
+    # rk45: steps of the flows that have not integrated the whole interval yet, finished flows leave the batch
+    # (with the coefficients of a batch of parameter sets, an array of shape (dim, monomials, n))
+    result = [np.array(s, dtype=float) for s in state]
+    active = np.arange(len(result[0]))
+    state = [s.copy() for s in result]
+    remaining = np.full(len(active), float(time))
+    h = remaining.copy()
+    batch = isinstance(c, np.ndarray) and c.ndim == 3
+    with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+        while len(active) > 0:
+            last = h >= remaining
+            h = np.where(last, remaining, h)
+
+            new_state, error = dormand_prince_step(state, c, map_function, h)
+            scale = [probe['tolerance'] * (1 + np.maximum(np.abs(s), np.abs(n))) for s, n in zip(state, new_state)]
+            norm = np.sqrt(sum((e / sc)**2 for e, sc in zip(error, scale)) / len(state))
+            accept = norm <= 1
+
+            state = [np.where(accept, n, s) for s, n in zip(state, new_state)]
+            remaining = np.where(accept, np.where(last, 0, remaining - h), remaining)
+            factor = np.where(norm > 0, 0.9 * norm**-0.2, 5)
+            factor = np.where(np.isfinite(factor), factor, 0.2)
+            h = h * np.where(accept, np.minimum(5, factor), np.maximum(0.2, factor))
+
+            # flows without convergence of the step size are left (they are out of bounds)
+            stuck = (remaining > 0) & (h < time * 1e-12)
+            done = (remaining <= 0) | stuck
+            if done.any():
+                for values, s in zip(result, state):
+                    values[active[done]] = np.where(stuck[done], np.inf, s[done])
+                keep = ~done
+                active = active[keep]
+                state = [s[keep] for s in state]
+                remaining, h = remaining[keep], h[keep]
+                if batch:
+                    c = c[..., keep]
+
+    return result
+
+
+# iterate polynomial map (integrator 0) or flow (integrator 1: euler, 2: rk4) from index start to stop with the
+# coefficient matrix c and the exponent table of the monomials, return iteration out of bounds or -1.
+# kernel of the numba backend (see get_kernels): the monomials and sums are evaluated in the same order as in the
+# generated map functions (see get_polynomial_source), so the points are the same as with the numpy backend
+def iterate_kernel(points, start, stop, c, exponents, time, integrator, bound):
+
+    dim, num_monomials = c.shape
+    powers = np.ones((dim, exponents.max() + 1))
+    state = points[:, start].copy()
+    stage = np.empty(dim)
+    slopes = np.empty((4, dim))
+    weights = np.array([0.0, 0.5, 0.5, 1.0])
+    num_stages = 4 if integrator == 2 else 1
+
+    for i in range(start, stop):
+
+        for s in range(num_stages):
+            for k in range(dim):
+                stage[k] = state[k] + weights[s]*time*slopes[s - 1, k] if s > 0 else state[k]
+                powers[k, 1] = stage[k]
+                for e in range(2, powers.shape[1]):
+                    powers[k, e] = powers[k, e - 1] * stage[k]
+
+            # coefficient matrix x monomial vector
+            for j in range(num_monomials):
+                monomial = 1.0
+                for k in range(dim):
+                    if exponents[j, k] > 0:
+                        monomial *= powers[k, exponents[j, k]]
+                for d in range(dim):
+                    slopes[s, d] = c[d, j] if j == 0 else slopes[s, d] + c[d, j] * monomial
+
+        outside = False
+        for k in range(dim):
+            if integrator == 0:
+                state[k] = slopes[0, k]
+            elif integrator == 1:
+                state[k] = state[k] + time*slopes[0, k]
+            else:
+                state[k] = state[k] + time/6*(slopes[0, k] + 2*slopes[1, k] + 2*slopes[2, k] + slopes[3, k])
+            points[k, i + 1] = state[k]
 
-        # check histogram of points at index 100 to 199
-        if i == 300:
-            if check_histogram(3, x[i-100:i], y[i-100:i], z[i-100:i], parameter_string) == False:
-                return False
+            # values out of bounds -> abort
+            outside |= abs(state[k]) > bound
 
-    # plot 3d attractor
-    for output_mode in output_modes:
-        plot_point_cloud(x[plot_offset::sieve],
-                        y[plot_offset::sieve],
-                        z[plot_offset::sieve],
-                        '3d',
-                        output_mode,
-                        parameter_string,
-                        subtitle_string)
+        if outside:
+            return i
 
-    # return success
-    return True
+    return -1
+
+
+# count different values of rounded to decimals like count_diversity: the histogram with one bin per value
+# uses the same bin edges and the same rounding as numpy.histogram and numpy.round (kernel of the numba backend)
+def count_values_kernel(values, decimals):
+
+    n = len(values)
+    scale = 10.0**decimals
+    rounded = np.empty(n)
+    for k in range(n):
+        rounded[k] = np.rint(values[k] * scale) / scale
+
+    first, last = rounded.min(), rounded.max()
+    if first == last:
+        first, last = first - 0.5, last + 0.5
+    edges = np.arange(n + 1) * ((last - first) / n) + first
+    edges[n] = last
+
+    filled = np.zeros(n, dtype=np.bool_)
+    for k in range(n):
+        index = min(int((rounded[k] - first) / (last - first) * n), n - 1)
+        if rounded[k] < edges[index]:
+            index -= 1
+        elif rounded[k] >= edges[index + 1] and index != n - 1:
+            index += 1
+        filled[index] = True
+
+    return np.count_nonzero(filled)
+
+
+# compile the kernels of the numba backend (cached on disk, so they are compiled only once),
+# None for the numpy backend or backend "auto" without numba
+@functools.lru_cache(maxsize=None)
+def get_kernels(backend):
+
+    if backend == 'numpy':
+        return None
+
+    numba = get_numba()
+    if numba is None:
+        if backend == 'numba':
+            raise ValueError('backend "numba" needs the numba package')
+        return None
+
+    jit = numba.njit(cache=True)
+    return {'iterate': jit(iterate_kernel), 'diversity': jit(count_values_kernel)}
+
+
+# get name of the active backend of the probe settings
+def get_backend(probe=probe_settings):
+    return 'numpy' if get_kernels(probe['backend']) is None else 'numba'
+
+
+# iterate map or flow with the compiled kernel (same interface as iterate_2d_map, iterate_3d_map and iterate_3d_flow)
+def iterate_compiled(points, start, stop, c, map_function, time, bound, kernel=None, exponents=None, integrator=0):
+
+    i = kernel(points, start, stop, np.asarray(c, dtype=float), exponents, 0.0 if time == None else float(time),
+               integrator, float(bound))
+
+    return i if i >= 0 else None
+
+
+# get iteration function according to map mode (and integrator of the probe settings for flow mode),
+# the compiled kernel of the numba backend replaces maps and flows with euler or rk4 steps
+def get_iteration_function(m, time, probe=probe_settings):
+
+    kernels = get_kernels(probe['backend'])
+    integrator = 0 if time == None or m[0:2] == '2d' else {'euler': 1, 'rk4': 2}.get(probe['integrator'])
+    if kernels != None and integrator != None:
+        return functools.partial(iterate_compiled, kernel=kernels['iterate'],
+                                 exponents=get_exponent_table(int(m[0]), get_map_degree(m)), integrator=integrator)
+
+    if m[0:2] == '2d':
+        return iterate_2d_map
+    elif time == None:
+        return iterate_3d_map
+    elif probe['integrator'] == 'rk4':
+        return iterate_3d_flow_rk4
+    elif probe['integrator'] == 'rk45':
+        return functools.partial(iterate_3d_flow_rk45, tolerance=probe['tolerance'])
+    else:
+        return iterate_3d_flow
+
+
+# get reusable buffer for the probe stage
+@functools.lru_cache(maxsize=None)
+def get_probe_buffer(dim, length):
+    return np.empty((dim, length + 1))
+
+
+# update bounding box of the points of an attractor in info with a chunk of points
+def update_bounds(info, points):
+
+    lower, upper = points.min(axis=1), points.max(axis=1)
+    if info['bounds'] is not None:
+        lower, upper = np.minimum(info['bounds'][0], lower), np.maximum(info['bounds'][1], upper)
+
+    info['bounds'] = (lower, upper)
+
+
+# iterate attractor according to map mode chunk by chunk and yield (index of first point, points of shape (dim, n)),
+# the points are views of reused buffers and only valid until the next chunk is requested.
+# a short trajectory is iterated in a reusable buffer first and tested for bounds, diversity and chaos,
+# it is the first chunk. the following chunks are iterated in segments with the last point carried over,
+# after each segment periodic orbits are detected and the lyapunov exponent is updated, both abort early.
+# info about the attractor is stored in info: reason of rejection as (stage, message) or None,
+# estimated lyapunov exponent (per iteration) or None, number of iterations of the estimate,
+# bounding box of all points as (minima, maxima), iteration out of bounds (or None)
+# and number of different values per coordinate in the probe window (or None).
+# a rejected attractor ends the iteration, so chunks yielded before belong to a rejected attractor.
+# resume continues a trajectory that passed the probe stage before: dict with index and coordinates of its last point,
+# lyapunov exponent, steps and bounds of info (the points before are not yielded again).
+# probe_points are the points of the probe stage iterated before (by search_batch, shape (dim, length + 1)),
+# they replace the iteration of the probe stage, the tests are done as usual
+def generate_attractor(parameter_string, num_points, time, plot_offset, m, map_function, info, probe=probe_settings,
+                       chunk_size=100000, segment=1000, resume=None, probe_points=None):
+
+    dim = int(m[0])
+    iterate = get_iteration_function(m, time, probe)
+    with profiler.stage('coefficients'):
+        c = get_coefficient_rows(get_coefficient(parameter_string, coeff), dim)
+    num_iterations = num_points + plot_offset - 1
+    tracking = probe['lyapunov'] != None or probe['score']
+    direction = np.full(dim, 1 / math.sqrt(dim))
+
+    if resume is None:
+        length = min(probe['length'], num_iterations)
+        info.update(reason=None, lyapunov=None, steps=0, bounds=None, iteration=None, diversity=None)
+
+        # probe stage: initialize start values, iterate and test
+        buffer = get_probe_buffer(dim, probe['length'])
+        buffer[:, 0] = start_value
+        profiler.count('tested')
+
+        i = None
+        if probe_points is not None:
+            buffer[:, :length + 1] = probe_points
+        else:
+            with profiler.stage('iteration'):
+                i = iterate(buffer, 0, length, c, map_function, time, probe['bound'])
+        if i != None:
+            info['reason'] = ('bounds', 'out of bounds at iteration {} - {}'
+                              .format(i, ' '.join(str(value) for value in buffer[:, i + 1].tolist())))
+            info['iteration'] = i
+            profiler.reject('bounds', i)
+            return
+
+        # the lyapunov exponent is only estimated with a complete probe window
+        tracking &= length == probe['length']
+        if length == probe['length']:
+            window = buffer[:, length - probe['window']:length + 1]
+
+            with profiler.stage('diversity'):
+                info['diversity'] = count_diversity(dim, window[0, 1:], window[1, 1:], window[-1, 1:],
+                                                    get_kernels(probe['backend']))
+                reason = check_diversity(info['diversity'], probe['window'], probe['threshold'])
+            if reason != None:
+                info['reason'] = ('diversity', reason)
+                profiler.reject('diversity', length)
+                return
+
+            # start estimate of lyapunov exponent with the probe window
+            if tracking:
+                with profiler.stage('lyapunov'):
+                    total, direction = track_lyapunov(buffer, length - probe['window'], length, c, map_function,
+                                                      time, iterate, direction)
+                steps = probe['window']
+                info.update(lyapunov=total / steps, steps=steps)
+
+                if probe['lyapunov'] != None and info['lyapunov'] < probe['lyapunov']:
+                    info['reason'] = ('chaos', 'low divergence of last {} points: lyapunov exponent {:.4f}'
+                                      .format(steps, info['lyapunov']))
+                    profiler.reject('chaos', length)
+                    return
+
+        with profiler.stage('cycle'):
+            cycle_state = (np.round(buffer[:, 0], probe['cycle']), 0, 1)
+            period, cycle_state = detect_cycle(buffer, 0, length, probe['cycle'], cycle_state)
+        if period != None:
+            info['reason'] = ('cycle', 'periodic orbit with period {}'.format(period))
+            profiler.reject('cycle', length)
+            return
+
+        update_bounds(info, buffer[:, :length + 1])
+        yield 0, buffer[:, :length + 1]
+        last_point = buffer[:, length]
+
+    # continue trajectory, the estimate of the lyapunov exponent is continued with a new direction
+    else:
+        length = resume['index']
+        last_point = resume['point']
+        info.update(reason=None, lyapunov=resume['lyapunov'], steps=resume['steps'], bounds=resume['bounds'],
+                    iteration=None, diversity=None)
+        steps = resume['steps'] if resume['lyapunov'] != None else 0
+        total = resume['lyapunov'] * steps if steps > 0 else 0.0
+        cycle_state = (np.round(last_point, probe['cycle']), length, 1)
+
+    if length >= num_iterations:
+        return
+
+    # full iteration: column 0 of the chunk buffer holds the last point of the previous chunk
+    points = np.empty((dim, min(chunk_size, num_iterations - length) + 1))
+    points[:, 0] = last_point
+
+    for first in range(length, num_iterations, chunk_size):
+        last = min(first + chunk_size, num_iterations)
+
+        for start in range(first, last, segment):
+            stop = min(start + segment, last)
+
+            with profiler.stage('iteration'):
+                i = iterate(points, start - first, stop - first, c, map_function, time, probe['bound'])
+            if i != None:
+                info['reason'] = ('bounds', 'out of bounds at iteration {} - {}'
+                                  .format(first + i, ' '.join(str(value) for value in points[:, i + 1].tolist())))
+                info['iteration'] = first + i
+                profiler.reject('bounds', first + i)
+                return
+
+            with profiler.stage('cycle'):
+                period, cycle_state = detect_cycle(points, start, stop, probe['cycle'], cycle_state, first)
+            if period != None:
+                info['reason'] = ('cycle', 'periodic orbit with period {} at iteration {}'.format(period, stop))
+                profiler.reject('cycle', stop)
+                return
+
+            if tracking:
+                with profiler.stage('lyapunov'):
+                    stretching, direction = track_lyapunov(points, start - first, stop - first, c, map_function,
+                                                           time, iterate, direction)
+                total += stretching
+                steps += stop - start
+                info.update(lyapunov=total / steps, steps=steps)
+
+                if probe['lyapunov'] != None and info['lyapunov'] < probe['lyapunov']:
+                    info['reason'] = ('chaos', 'low divergence after {} iterations: lyapunov exponent {:.4f}'
+                                      .format(stop, info['lyapunov']))
+                    profiler.reject('chaos', stop)
+                    return
+
+        chunk = points[:, 1:last - first + 1]
+        update_bounds(info, chunk)
+        yield first + 1, chunk
+
+        points[:, 0] = points[:, last - first]
+
+
+# iterate an ensemble of chains of an attractor (ensemble mode) and yield chunks like generate_attractor:
+# the attractor is tested by the probe stage of generate_attractor, the chains start at random points of the
+# second half of the probe trajectory (slightly perturbed), advance together as arrays and drop their first
+# plot_offset points as transient, so num_points points take about num_points / ensemble steps.
+# chains out of bounds are dropped individually (with their points of the current chunk), the attractor is rejected
+# if all chains escape. the points of every chunk are ordered chain by chain, the first chunk has index plot_offset
+def generate_ensemble(parameter_string, num_points, time, plot_offset, m, map_function, info, probe=probe_settings,
+                      chunk_size=100000, ensemble=100, seed=0, noise=1e-6):
+
+    dim = int(m[0])
+    trajectory = None
+    for start, chunk in generate_attractor(parameter_string, probe['length'] + 1, time, 0, m, map_function, info,
+                                           probe):
+        trajectory = chunk.copy()
+    if info['reason'] != None:
+        return
+
+    # start values of the chains
+    rng = np.random.default_rng(seed)
+    candidates = trajectory[:, trajectory.shape[1] // 2:]
+    state = candidates[:, rng.integers(0, candidates.shape[1], ensemble)]
+    state = list(state + noise * (1 + np.abs(state)) * rng.standard_normal(state.shape))
+
+    c = get_coefficient_rows(get_coefficient(parameter_string, coeff), dim)
+    block = max(chunk_size // ensemble, 1)
+    buffer = np.empty((dim, block, ensemble))
+    info['bounds'] = None
+    count = 0
+    i = 0
+
+    while count < num_points:
+        steps = block if i >= plot_offset else min(block, plot_offset - i)
+
+        with profiler.stage('iteration'), np.errstate(over='ignore', invalid='ignore'):
+            for j in range(steps):
+                state = map_function(*state, c) if time == None else step_flow(state, c, map_function, time, probe)
+
+                # values out of bounds -> drop chains
+                inside = np.ones(len(state[0]), dtype=bool)
+                for values in state:
+                    inside &= np.abs(values) <= probe['bound']
+                if not inside.all():
+                    profiler.count('escaped chains', np.count_nonzero(~inside))
+                    state = [values[inside] for values in state]
+                    buffer = buffer[:, :, inside]
+                    if len(state[0]) == 0:
+                        info['reason'] = ('bounds', 'all chains of the ensemble out of bounds at iteration {}'
+                                          .format(i + j))
+                        info['iteration'] = i + j
+                        profiler.reject('bounds', i + j)
+                        return
+
+                for k in range(dim):
+                    buffer[k, j] = state[k]
+        i += steps
+
+        # transient
+        if i <= plot_offset:
+            continue
+
+        chunk = buffer[:, :steps].transpose(0, 2, 1).reshape(dim, -1)[:, :num_points - count]
+        update_bounds(info, chunk)
+        yield plot_offset + count, chunk
+        count += chunk.shape[1]
+
+
+# get path (without extension) of a trajectory in the cache, content addressed by map mode,
+# parameter string, start value (a list for start values with different signs), time step, integrator
+# of flow mode other than euler (with tolerance of rk45) and precision other than float64
+def get_cache_path(cache, m, parameter_string, time, probe=probe_settings, start=start_value):
+    key = [m, parameter_string, start, time]
+    if time != None and probe['integrator'] != 'euler':
+        key += [probe['integrator'], probe['tolerance']] if probe['integrator'] == 'rk45' else [probe['integrator']]
+    if cache['precision'] != 'float64':
+        key += [cache['precision']]
+    key = json.dumps(key)
+    return os.path.join(cache['directory'], hashlib.sha1(key.encode()).hexdigest())
+
+
+# get settings of the tests a cached trajectory has passed (stored in its meta data):
+# probe settings of the bound, diversity, cycle and lyapunov tests
+def get_cache_tests(probe=probe_settings):
+    return {key: probe[key] for key in ('length', 'window', 'threshold', 'bound', 'lyapunov', 'cycle')}
+
+
+# remove least recently used trajectories until the cache is not larger than its maximal size
+# (worker processes may evict the same files at the same time)
+def evict_cache(cache):
+
+    entries = []
+    for name in os.listdir(cache['directory']):
+        if name.endswith('.npy'):
+            path = os.path.join(cache['directory'], name[:-4])
+            try:
+                stat = os.stat(path + '.npy')
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for mtime, size, path in entries)
+    for mtime, size, path in sorted(entries):
+        if total <= cache['size'] * 2**20:
+            break
+        for extension in ('.npy', '.json'):
+            try:
+                os.remove(path + extension)
+            except FileNotFoundError:
+                pass
+        total -= size
+
+
+# iterate attractor like generate_attractor with a cache of trajectories on disk (npy files of shape (n, dim)):
+# a cached trajectory is read memory mapped without testing it again if it passed the tests with the same settings
+# (see get_cache_tests) and a probe at least as long as the probe of this run (probe length or all points of a shorter
+# trajectory) and has a lyapunov exponent when one is needed, else it is calculated again and replaced.
+# a shorter one is extended from its last point.
+# new points are added to the cache unless the attractor is rejected, the least recently used trajectories are
+# evicted if the cache gets too large. with a symmetry group the trajectory is stored as trajectory of the canonical
+# string (see get_canonical), so all symmetric strings with the same start value share it. the points are stored
+# with the precision of the cache, the last point is kept in float64 to extend the trajectory exactly.
+# probe_points are only used for a trajectory that is not cached (see generate_attractor)
+def generate_cached_attractor(cache, parameter_string, num_points, time, plot_offset, m, map_function, info,
+                              probe=probe_settings, chunk_size=100000, probe_points=None):
+
+    dim = int(m[0])
+    canonical, perm, signs = get_canonical(parameter_string, m, probe['symmetry'])
+    start = start_value if (signs > 0).all() else (signs * start_value).tolist()
+    path = get_cache_path(cache, m, canonical, time, probe, start)
+    inverse = np.argsort(perm)
+    dtype = np.dtype(cache['precision']).newbyteorder('<')
+    num_total = num_points + plot_offset
+    count = 0
+    resume = None
+
+    # use a cached trajectory only if it passed the same tests with a probe as long as the probe of this run
+    # (a shorter trajectory skips the diversity test) and the lyapunov exponent can be resumed (it is only
+    # estimated with a complete probe window, see generate_attractor)
+    tests = get_cache_tests(probe)
+    probed = min(probe['length'], num_total - 1)
+    tracking = (probe['lyapunov'] != None or probe['score']) and num_total > probe['length']
+    meta = None
+    if os.path.exists(path + '.npy') and os.path.exists(path + '.json'):
+        with open(path + '.json') as infile:
+            meta = json.load(infile)
+        if meta.get('tests') != tests or meta.get('probed', 0) < probed or (tracking and meta['lyapunov'] == None):
+            meta = None
+        else:
+            probed = meta['probed']
+
+    # read cached points, mark trajectory as recently used
+    if meta != None:
+        stored = np.load(path + '.npy', mmap_mode='r')
+        count = min(len(stored), num_total)
+        os.utime(path + '.npy')
+
+        info.update(reason=None, lyapunov=meta['lyapunov'], steps=meta['steps'], bounds=None, iteration=None,
+                    diversity=None, rounding=meta.get('rounding'))
+        for first in range(0, count, chunk_size):
+            chunk = (signs.astype(dtype)[:, None] * stored[first:min(first + chunk_size, count)].T)[inverse]
+            update_bounds(info, chunk)
+            yield first, chunk
+
+        if count == num_total:
+            return
+
+        last = np.array(meta['last']) if 'last' in meta else stored[count - 1]
+        resume = {'index': count - 1, 'point': (signs * last)[inverse], 'lyapunov': meta['lyapunov'],
+                  'steps': meta['steps'], 'bounds': info['bounds']}
+        del stored
+
+    # calculate missing points and append them to a new or the cached file
+    outfile = None
+    added = 0
+    last = None
+    try:
+        for first, chunk in generate_attractor(parameter_string, num_points, time, plot_offset, m, map_function, info,
+                                               probe, chunk_size, resume=resume,
+                                               probe_points=probe_points if resume is None else None):
+            if outfile is None and count == 0:
+                outfile = open(path + '.part', 'wb')
+                write_npy_header(outfile, 0, dim, descr=dtype.str)
+            elif outfile is None:
+                outfile = open(path + '.npy', 'r+b')
+                outfile.seek(0, os.SEEK_END)
+
+            points = signs[:, None] * chunk[perm]
+            stored = np.ascontiguousarray(points.T, dtype=dtype)
+            update_rounding(info, points, stored.T)
+            outfile.write(stored.tobytes())
+            added += chunk.shape[1]
+            last = points[:, -1]
+            yield first, chunk
+
+    finally:
+        if outfile is not None:
+
+            # rejected or aborted: drop new points
+            if info['reason'] != None or count + added < num_total:
+                outfile.truncate(outfile.tell() - added * dim * dtype.itemsize)
+                outfile.close()
+                if count == 0:
+                    os.remove(path + '.part')
+
+            else:
+                outfile.seek(0)
+                write_npy_header(outfile, count + added, dim, descr=dtype.str)
+                outfile.close()
+                if count == 0:
+                    os.replace(path + '.part', path + '.npy')
+
+                with open(path + '.json', 'w') as outfile:
+                    json.dump({'m': m, 'string': canonical, 'start': start, 'time': time,
+                               'lyapunov': info['lyapunov'], 'steps': info['steps'], 'last': last.tolist(),
+                               'rounding': info.get('rounding'), 'tests': tests, 'probed': probed}, outfile)
+                evict_cache(cache)
+
+
+# iterate attractor without storing the points, return info about the attractor (see generate_attractor),
+# the quality statistics are only tracked for the quality test
+def check_attractor(parameter_string, num_points, time, plot_offset, m, map_function, probe=probe_settings,
+                    probe_points=None):
+
+    info = {}
+    chunks = generate_attractor(parameter_string, num_points, time, plot_offset, m, map_function, info, probe,
+                                probe_points=probe_points)
+    if probe['cells'] != None or probe['dimension'] != None:
+        chunks = track_quality(chunks, info, int(m[0]), plot_offset, parameter_string, probe)
+    for chunk in chunks:
+        pass
+
+    return info
+
+
+# refine chunks of a flow trajectory with num_points + plot_offset points to num_points*interpolate + plot_offset points
+# (equally spaced over the whole trajectory) by cubic hermite interpolation between consecutive points,
+# the slopes are given by the vector field (evaluated for whole chunks at once)
+def interpolate_chunks(chunks, num_points, plot_offset, interpolate, parameter_string, map_function, time):
+
+    num_total = num_points + plot_offset
+    if interpolate == 1 or num_total < 2:
+        yield from chunks
+        return
+
+    c = get_coefficient_rows(get_coefficient(parameter_string, coeff), 3)
+    num_samples = num_points*interpolate + plot_offset
+    step = (num_total - 1) / (num_samples - 1)
+    sample = 0
+    previous = None
+
+    for start, points in chunks:
+
+        # the last point of the previous chunk starts the first interval
+        if previous is not None:
+            points = np.hstack([previous, points])
+            start -= 1
+        stop = start + points.shape[1]
+        previous = points[:, -1:].copy()
+
+        # samples up to the last point of the chunk (including the last point of the trajectory)
+        end = num_samples if stop == num_total else min(math.ceil((stop - 1) / step), num_samples)
+        if end <= sample:
+            continue
+
+        with profiler.stage('interpolation'):
+            t = np.arange(sample, end) * step - start
+            i = np.clip(np.floor(t).astype(np.intp), 0, points.shape[1] - 2)
+            s = t - i
+            slopes = time * np.array(map_function(*points, c))
+            refined = (1 + 2*s) * (1 - s)**2 * points[:, i] + s * (1 - s)**2 * slopes[:, i] + \
+                s**2 * (3 - 2*s) * points[:, i + 1] + s**2 * (s - 1) * slopes[:, i + 1]
+
+        yield sample, refined
+        sample = end
+
+
+# store points of shape (dim, n) with precision dtype in an interleaved array of shape (n, dim), return it as view
+# of shape (dim, n) (see update_rounding)
+def store_points(points, dtype, info):
+    stored = np.empty((points.shape[1], len(points)), dtype=dtype)
+    stored[:] = points.T
+    update_rounding(info, points, stored.T)
+    return stored.T
+
+
+# update largest rounding error of points stored with lower precision in info['rounding']
+def update_rounding(info, points, stored):
+    if stored.dtype != points.dtype and points.size > 0:
+        with np.errstate(invalid='ignore', over='ignore'):
+            error = float(np.max(np.abs(stored - points)))
+        info['rounding'] = max(info.get('rounding') or 0.0, error)
+
+
+# format precision loss of points stored with lower precision: largest rounding error
+# and the error in pixels of a density image of the attractor
+def format_rounding(info, precision, size):
+    lower, upper = info['bounds']
+    span = max(float(np.max(upper - lower)), 1e-12)
+    return 'stored as {}: largest rounding error {:.3g} ({:.3g} pixels of a {} pixel image)'.format(
+        precision, info['rounding'], info['rounding'] * size * 0.9 / span, size)
+
+
+# format quality statistics of an attractor (see track_quality)
+def format_quality(quality):
+    dimension = quality['dimension']
+    return 'correlation dimension {}, {} occupied cells of {} points'.format(
+        'unknown' if dimension is None else '{:.3f}'.format(dimension), quality['cells'], quality['points'])
+
+
+# select points to plot from chunks (index of first point, points): every sieve'th point from index plot_offset,
+# the selected points are views of the chunks
+def select_chunks(chunks, plot_offset, sieve):
+
+    for start, points in chunks:
+        first = max(start, plot_offset)
+        first += -(first - plot_offset) % sieve
+        if first < start + points.shape[1]:
+            yield points[:, first - start::sieve]
+
+
+# output sink collecting all points of an attractor in an interleaved array of shape (n, dim) and plotting them
+# with plot_point_cloud (matplotlib and plotly need the whole point cloud at once)
+class PointCloudSink:
+
+    def __init__(self, dim, output_mode, parameter_string, subtitle_string, render=render_settings):
+        self.dim = dim
+        self.output_mode = output_mode
+        self.parameter_string = parameter_string
+        self.subtitle_string = subtitle_string
+        self.render = render
+        self.chunks = []
+
+    def write(self, points):
+        self.chunks.append(np.ascontiguousarray(points.T))
+
+    def close(self):
+        points = np.concatenate(self.chunks).T if self.chunks else np.empty((self.dim, 0))
+        self.filename = plot_point_cloud(points[0], points[1], points[2] if self.dim == 3 else 0,
+                                         '{}d'.format(self.dim), self.output_mode, self.parameter_string,
+                                         self.subtitle_string, self.render)
+
+    def abort(self):
+        self.chunks = []
+
+
+# output sink accumulating a density image (see render_density) chunk by chunk in constant memory:
+# the mapping to the image is fixed with the first buffer_size points and enlarged for points outside
+class DensitySink:
+
+    def __init__(self, dim, parameter_string, render=render_settings, buffer_size=100000):
+        self.dim = dim
+        self.parameter_string = parameter_string
+        self.render = render
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.count = 0
+        self.density = None
+        self.bounds = None
+
+    def write(self, points):
+        u, v = (points[0], points[1]) if self.dim == 2 else project_points(*points)
+        self.count += len(u)
+
+        if self.density is None:
+            self.buffer.append((np.array(u), np.array(v)))
+            if sum(len(u) for u, v in self.buffer) >= self.buffer_size:
+                self.flush()
+        else:
+            self.accumulate(u, v)
+
+    def flush(self):
+        u = np.concatenate([u for u, v in self.buffer])
+        v = np.concatenate([v for u, v in self.buffer])
+        self.buffer = []
+
+        self.bounds = get_image_bounds(u, v, self.render['size']) if len(u) > 0 else (0.0, 0.0, 1.0)
+        self.density = np.zeros((self.render['size'], self.render['size']), dtype=np.int64)
+        self.accumulate(u, v)
+
+    # accumulate points into the density image, enlarge the mapping for points outside
+    def accumulate(self, u, v):
+        if len(u) > 0:
+            self.bounds = enlarge_density(self.density, self.bounds, u, v)
+            accumulate_density(self.density, u, v, self.bounds)
+
+    def close(self):
+        if self.density is None:
+            self.flush()
+
+        self.filename = '{}D Attractor {} {} Vertices.png'.format(self.dim, self.parameter_string, self.count)
+        write_png(self.filename, tone_map(self.density, self.render['tone'], self.render['gamma'], self.render['color']))
+        print('attractor {} saved to .png file ({} vertices)'.format(self.parameter_string, self.count))
+
+    def abort(self):
+        self.buffer = []
+        self.density = None
+
+
+# output sink rendering the build-up of an attractor as numbered frames: the density image (see DensitySink)
+# is accumulated incrementally and a frame is emitted after every render['frame'] new points, so the cost of a frame
+# depends only on the new points and the image size. the mapping is fixed with the first buffer_size points (the
+# frames of these points are emitted afterwards) and enlarged for points outside. frames are written as png files
+# to a directory or piped as png stream to the standard input of render['encoder'] ({} replaced by the name)
+class AnimationSink(DensitySink):
+
+    def __init__(self, dim, parameter_string, render=render_settings, buffer_size=100000):
+        super().__init__(dim, parameter_string, render, buffer_size)
+        self.frames = 0
+        self.pending = 0
+        name = '{}D Attractor {}'.format(dim, parameter_string)
+
+        if render['encoder'] != None:
+            self.filename = name
+            self.encoder = subprocess.Popen([arg.replace('{}', name) for arg in shlex.split(render['encoder'])],
+                                            stdin=subprocess.PIPE)
+        else:
+            self.filename = name + ' frames'
+            self.encoder = None
+            os.makedirs(self.filename, exist_ok=True)
+            for entry in os.listdir(self.filename):
+                if re.fullmatch(r'frame_\d+\.png', entry):
+                    os.remove(os.path.join(self.filename, entry))
+
+    # accumulate points frame by frame (see DensitySink.accumulate)
+    def accumulate(self, u, v):
+        a = 0
+        while a < len(u):
+            b = min(len(u), a + self.render['frame'] - self.pending)
+            self.bounds = enlarge_density(self.density, self.bounds, u[a:b], v[a:b])
+            accumulate_density(self.density, u[a:b], v[a:b], self.bounds)
+            self.pending += b - a
+            if self.pending == self.render['frame']:
+                self.emit()
+            a = b
+
+    # encode current density image as frame
+    def emit(self):
+        image = encode_png(tone_map(self.density, self.render['tone'], self.render['gamma'], self.render['color']), 1)
+        self.frames += 1
+        self.pending = 0
+        profiler.count('frames')
+
+        if self.encoder != None:
+            try:
+                self.encoder.stdin.write(image)
+            except BrokenPipeError:
+                raise RuntimeError('encoder of attractor {} stopped with exit code {}'
+                                   .format(self.parameter_string, self.encoder.wait())) from None
+        else:
+            with open(os.path.join(self.filename, 'frame_{:06d}.png'.format(self.frames)), 'wb') as outfile:
+                outfile.write(image)
+
+    def close(self):
+        if self.density is None:
+            self.flush()
+        if self.pending > 0 or self.frames == 0:
+            self.emit()
+
+        if self.encoder != None:
+            self.encoder.stdin.close()
+            if self.encoder.wait() != 0:
+                raise RuntimeError('encoder of attractor {} failed with exit code {}'
+                                   .format(self.parameter_string, self.encoder.returncode))
+        print('attractor {} saved as {} frames ({} vertices)'.format(self.parameter_string, self.frames, self.count))
+
+    def abort(self):
+        super().abort()
+        if self.encoder != None:
+            self.encoder.kill()
+            self.encoder.wait()
+        else:
+            shutil.rmtree(self.filename, ignore_errors=True)
+
+
+# write points of shape (dim, n) as wavefront vertices (2d: z = 0), lines are formatted in blocks,
+# points of lower precision than float64 with as many digits as needed for their precision
+def write_obj_vertices(outfile, points, scale=1, block_size=10000):
+
+    value = {'float32': '%.9g', 'float16': '%.5g'}.get(points.dtype.name, '%r')
+    line = 'v {0} {0} {0}\n'.format(value) if len(points) == 3 else 'v {0} {0} 0\n'.format(value)
+
+    for a in range(0, points.shape[1], block_size):
+        block = (points[:, a:a + block_size] * scale).T
+        outfile.write(line * len(block) % tuple(block.ravel().tolist()))
+
+
+# write header of a binary ply file with count vertices, the count is padded to a fixed width
+# so the header can be rewritten with the final count
+def write_ply_header(outfile, count, comment):
+    outfile.write('ply\nformat binary_little_endian 1.0\ncomment {}\nelement vertex {:015d}\n'
+                  'property float x\nproperty float y\nproperty float z\nend_header\n'
+                  .format(comment, count).encode('ascii'))
+
+
+# write header of a npy file with an array of shape (count, dim) and type descr (little endian float64 by default),
+# the header is padded to a fixed size so it can be rewritten with the final count
+def write_npy_header(outfile, count, dim, size=128, descr='<f8'):
+    header = "{{'descr': '{}', 'fortran_order': False, 'shape': ({}, {}), }}".format(descr, count, dim)
+    outfile.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', size - 10) + header.ljust(size - 11).encode('latin1') + b'\n')
+
+
+# output sink writing points to a file chunk by chunk with precision (see render_settings),
+# the file is removed if the sink is aborted
+class FileSink:
+
+    extension = None
+    mode = 'wb'
+
+    def __init__(self, dim, parameter_string, precision='float64'):
+        self.dim = dim
+        self.parameter_string = parameter_string
+        self.dtype = np.dtype(precision).newbyteorder('<')
+        self.filename = '{}.{}'.format(parameter_string, self.extension)
+        self.count = 0
+        self.outfile = open(self.filename, self.mode, buffering=2**20)
+        self.write_header()
+
+    def write(self, points):
+        self.count += points.shape[1]
+        self.write_points(points)
+
+    def close(self):
+        self.finish()
+        self.outfile.close()
+        print('attractor {} saved to .{} file ({} vertices)'.format(self.parameter_string, self.extension, self.count))
+
+    def abort(self):
+        self.outfile.close()
+        os.remove(self.filename)
+
+    def write_header(self):
+        pass
+
+    def finish(self):
+        pass
+
+
+# output sink writing points to a wavefront file (3d: scaled by 10)
+class ObjSink(FileSink):
+
+    extension = 'obj'
+    mode = 'w'
+
+    def write_header(self):
+        self.outfile.write('o attractor\n')
+
+    def write_points(self, points):
+        write_obj_vertices(self.outfile, points, 1 if self.dim == 2 else 10)
+
+
+# output sink writing points to a binary little endian ply file as float32 (2d: z = 0, 3d: scaled by 10),
+# the vertex count is written when the sink is closed
+class PlySink(FileSink):
+
+    extension = 'ply'
+
+    def write_header(self):
+        write_ply_header(self.outfile, self.count, 'attractor {}'.format(self.parameter_string))
+
+    def write_points(self, points):
+        vertices = np.zeros((points.shape[1], 3), dtype='<f4')
+        vertices[:, :self.dim] = points.T * (1 if self.dim == 2 else 10)
+        self.outfile.write(vertices.tobytes())
+
+    def finish(self):
+        self.outfile.seek(0)
+        self.write_header()
+
+
+# output sink writing points to a npy file as array of shape (n, dim) and type of the precision (unscaled),
+# the shape is written when the sink is closed
+class NpySink(FileSink):
+
+    extension = 'npy'
+
+    def write_header(self):
+        write_npy_header(self.outfile, self.count, self.dim, descr=self.dtype.str)
+
+    def write_points(self, points):
+        self.outfile.write(np.ascontiguousarray(points.T, dtype=self.dtype).tobytes())
+
+    def finish(self):
+        self.outfile.seek(0)
+        self.write_header()
+
+
+# open output sinks for all output modes
+def get_sinks(dim, output_modes, parameter_string, subtitle_string, render=render_settings):
+
+    sinks = []
+    for output_mode in output_modes:
+        if output_mode == 'png' and render['renderer'] == 'density':
+            sinks.append(DensitySink(dim, parameter_string, render, render['chunk']))
+        elif output_mode == 'frames':
+            sinks.append(AnimationSink(dim, parameter_string, render, render['chunk']))
+        elif output_mode == 'obj':
+            sinks.append(ObjSink(dim, parameter_string, render['precision']))
+        elif output_mode == 'ply':
+            sinks.append(PlySink(dim, parameter_string))
+        elif output_mode == 'npy':
+            sinks.append(NpySink(dim, parameter_string, render['precision']))
+        elif output_mode in ('png', 'html'):
+            sinks.append(PointCloudSink(dim, output_mode, parameter_string, subtitle_string, render))
+
+    return sinks
 
 
 # check user input: number of guesses
 def check_num_guesses(number):
     if number < 1:
-        sys.exit('error: number of guesses must be at least 1')
+        raise ValueError('number of guesses must be at least 1')
 
 
 # check user input: number of points for plotting
 def check_num_points(points):
     if points < 1:
-        sys.exit('error: number of points must be at least 1')
+        raise ValueError('number of points must be at least 1')
 
 
 # check user input: output file format
 def check_output_mode(output):
-    if re.match(r'(png|html|obj)', output) is None:
-        sys.exit('error: output mode "{}" invalid, expect "png" and/or "html" and/or "obj"'.format(output))
+    if re.fullmatch(r'(png|html|frames|obj|ply|npy)', output) is None:
+        raise ValueError('output mode "{}" invalid, expect "png" and/or "html" and/or "frames" and/or "obj" and/or "ply" '
+                         'and/or "npy"'.format(output))
 
 
 # check user input: 2d/3d maps
 def check_map_mode(m):
-    if re.match(r'((3d_30)|(3d_60)|(3d_105)|(2d_12)|(2d_20))', m) is None:
-        sys.exit('error: map mode must be "3d_30" or "2d_12" or "2d_20"')  
+    if get_map_degree(m) is None:
+        raise ValueError('map mode must be "2d_N" or "3d_N" with N coefficients of a polynomial, '
+                         'e.g. "2d_12", "2d_20", "2d_30", "3d_30", "3d_60", "3d_105" or "3d_168"')
 
 
 # check user input: parameter string   
 def check_parameter_string(string):
-    if re.match(r'(([A-Z]{12})|([A-Z]{20})|([A-Z]{30})|([A-Z]{60}))', string) is None:
-        sys.exit('Error: parameter string must be 12 or 20 or 30 capital letters')
+    if re.fullmatch(r'[A-Z]+', string) is None:
+        raise ValueError('parameter string must consist of capital letters')
 
 
 # check user input: jump
 def check_sieve(jump):
     if jump < 1:
-        sys.exit('error: jump must be at least 1')
+        raise ValueError('jump must be at least 1')
         
 
 # check user input: plot offset
 def check_first_point(first):
     if first < 0:
-        sys.exit('error: start index for plotting must be at least 0')    
+        raise ValueError('start index for plotting must be at least 0')    
 
 
 # check user input: output modes
@@ -464,7 +2346,7 @@ def check_output_modes(outputs):
 # check user input: time
 def check_time(time):
     if not time > 0:
-        sys.exit('error: time must be bigger than 0') 
+        raise ValueError('time must be bigger than 0') 
 
 
 # check user input: mode vs string
@@ -473,85 +2355,643 @@ def check_string_length(m, s):
     m_length = int(m[3:])
     s_length = len(s)
     if m_length != s_length:
-        sys.exit('error: length of string must be "{}" for mode "{}"'.format(m_length, m)) 
+        raise ValueError('length of string must be "{}" for mode "{}"'.format(m_length, m)) 
+
+
+# check user input: batch size
+def check_batch_size(batch_size):
+    if batch_size < 0:
+        raise ValueError('batch size must be at least 0')
+
+
+# check user input: number of worker processes
+def check_workers(workers):
+    if workers < 1:
+        raise ValueError('number of workers must be at least 1')
+
+
+# check user input: random seed
+def check_seed(seed):
+    if seed < 0:
+        raise ValueError('seed must be at least 0')
+
+
+# check user input: probe stage
+def check_probe(length, window, threshold, bound, cycle):
+    if window < 2:
+        raise ValueError('probe window must be at least 2')
+    if length < window:
+        raise ValueError('probe length must be at least the probe window')
+    if threshold < 0:
+        raise ValueError('diversity threshold must be at least 0')
+    if not bound > 0:
+        raise ValueError('bound must be bigger than 0')
+    if cycle < 0:
+        raise ValueError('decimals for detection of periodic orbits must be at least 0')
+
+
+# check user input: thresholds of the quality test
+def check_quality_test(cells, dimension):
+    if cells != None and cells < 1:
+        raise ValueError('minimal number of occupied cells must be at least 1')
+    if dimension != None and not dimension >= 0:
+        raise ValueError('minimal correlation dimension must be at least 0')
+
+
+# check user input: density image
+def check_image(size, gamma):
+    if size < 3:
+        raise ValueError('image size must be at least 3')
+    if not gamma > 0:
+        raise ValueError('gamma must be bigger than 0')
+
+
+# check user input: maximal size of the trajectory cache
+def check_cache_size(size):
+    if size < 0:
+        raise ValueError('cache size must be at least 0')
+
+
+# check user input: query of the catalog
+def check_query(query, catalog_file):
+    if query < 0:
+        raise ValueError('number of queried attractors must be at least 0')
+    if query > 0 and catalog_file == None:
+        raise ValueError('query needs a catalog (option "--catalog")')
+
+
+# check user input: tolerance of integrator rk45
+def check_tolerance(tolerance):
+    if not tolerance > 0:
+        raise ValueError('tolerance must be bigger than 0')
+
+
+# check user input: backend of the iteration
+def check_backend(backend):
+    get_kernels(backend)
+
+
+# check user input: maximal number of points of html output
+def check_html_points(budget):
+    if budget < 0:
+        raise ValueError('number of html points must be at least 0')
+
+
+# check user input: new points per frame of the frames output
+def check_frame_points(points):
+    if points < 1:
+        raise ValueError('number of points per frame must be at least 1')
+
+
+# check user input: precision of the stored points
+def check_precision(precision):
+    if precision not in ('float64', 'float32', 'float16'):
+        raise ValueError('precision must be "float64", "float32" or "float16"')
+
+
+# check user input: encoder command of the frames output
+def check_encoder(encoder):
+    args = shlex.split(encoder)
+    if len(args) == 0 or shutil.which(args[0]) is None:
+        raise ValueError('encoder command "{}" not found'.format(encoder))
+
+
+# check user input: number of chains of ensemble mode
+def check_ensemble(ensemble, interpolate):
+    if ensemble < 1:
+        raise ValueError('ensemble must be at least 1')
+    if ensemble > 1 and interpolate > 1:
+        raise ValueError('interpolation is not available in ensemble mode')
+
+
+# check user input: atlas mode (the lyapunov score needs a renormalization interval in the second half of the probe)
+def check_atlas(indices, parameter_string, size, tile, score, probe_length, interval):
+    if parameter_string == '':
+        raise ValueError('atlas mode needs a parameter string (option "-s")')
+    if indices[0] == indices[1] or not all(0 <= index < len(parameter_string) for index in indices):
+        raise ValueError('atlas needs two different coefficient indices from 0 to {}'.format(len(parameter_string) - 1))
+    if size < 1 or tile < 1:
+        raise ValueError('atlas size and tile size must be at least 1')
+    if score == 'lyapunov' and probe_length < 2 * interval + 1:
+        raise ValueError('lyapunov score of atlas mode needs a probe length of at least {}'.format(2 * interval + 1))
+
+
+# check user input: enumeration mode with prefix, index range and shard "i/N"
+def check_enumeration(m, parameter_string, prefix, index_range, shard, interval):
+    n = int(m[3:])
+    if parameter_string != '':
+        raise ValueError('enumeration mode can not be combined with a parameter string (option "-s")')
+    if prefix != None and index_range != None:
+        raise ValueError('enumeration mode needs either a prefix or an index range')
+    if prefix != None and (re.fullmatch(r'[A-Z]*', prefix) is None or len(prefix) > n):
+        raise ValueError('prefix must consist of at most {} capital letters'.format(n))
+    if index_range != None and not 0 <= index_range[0] < index_range[1] <= len(coeff)**n:
+        raise ValueError('index range must be within 0 to {}'.format(len(coeff)**n))
+    match = re.fullmatch(r'(\d+)/(\d+)', shard)
+    if match is None or not int(match[1]) < int(match[2]):
+        raise ValueError('shard must be "i/N" with 0 <= i < N')
+    if interval < 0:
+        raise ValueError('checkpoint interval must be at least 0')
+
+
+# check user input: chunk size
+def check_chunk_size(chunk_size):
+    if chunk_size < 1:
+        raise ValueError('chunk size must be at least 1')
 
 
 # check user input: interpolation factor
 def check_interpolate(interpolate):
     if interpolate < 1:
-        sys.exit('error: interpolate must be bigger than 0') 
+        raise ValueError('interpolate must be bigger than 0') 
 
 
-# create random attractors
-def get_attractors(num_guesses, parameter_string, num_points, time, output_modes, sieve, plot_offset, m, interpolate):
-    found = 0
+# open catalog of tested attractors (sqlite database) with one entry per map mode, time interval and parameter string
+def open_catalog(filename):
+
+    catalog = sqlite3.connect(filename)
+    catalog.execute('pragma journal_mode = wal')
+    catalog.execute('create table if not exists attractors (m text, time real, string text, outcome text, '
+                    'message text, iteration integer, diversity text, lyapunov real, bounds text, '
+                    'tested timestamp default current_timestamp, cells integer, dimension real, '
+                    'primary key (m, time, string))')
+
+    # add columns of the quality statistics to catalogs of older versions
+    columns = [row[1] for row in catalog.execute('pragma table_info(attractors)')]
+    for column, kind in (('cells', 'integer'), ('dimension', 'real')):
+        if column not in columns:
+            catalog.execute('alter table attractors add column {} {}'.format(column, kind))
+
+    return catalog
+
+
+# get entry of the catalog for a tested attractor from its info (see generate_attractor): parameter string,
+# outcome ("found" or stage of rejection), message, iteration out of bounds, number of different values
+# in the probe window, lyapunov exponent, bounding box (as json), occupied cells and correlation dimension
+def get_outcome(parameter_string, info):
+
+    reason = info.get('reason')
+    diversity = info.get('diversity')
+    bounds = info.get('bounds')
+    quality = info.get('quality') or {}
+
+    return (parameter_string, reason[0] if reason else 'found', reason[1] if reason else None, info.get('iteration'),
+            json.dumps(diversity) if diversity is not None else None, info.get('lyapunov'),
+            json.dumps([bounds[0].tolist(), bounds[1].tolist()]) if bounds is not None else None,
+            quality.get('cells'), quality.get('dimension'))
+
+
+# add outcomes (parameter string, info) of tested attractors to the catalog (without commit)
+def record_outcomes(catalog, m, time, outcomes):
+    catalog.executemany('insert or replace into attractors (m, time, string, outcome, message, iteration, diversity, '
+                        'lyapunov, bounds, cells, dimension) values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        [(m, time or 0.0) + get_outcome(string, info) for string, info in outcomes])
+
+
+# get the parameter strings already tested according to the catalog
+def get_known_strings(catalog, m, time, parameter_strings, block_size=500):
+
+    known = set()
+    for a in range(0, len(parameter_strings), block_size):
+        block = list(parameter_strings[a:a + block_size])
+        rows = catalog.execute('select string from attractors where m = ? and time = ? and string in ({})'
+                               .format(', '.join('?' * len(block))), [m, time or 0.0] + block)
+        known.update(string for string, in rows)
+
+    return known
+
+
+# get parameter strings and lyapunov exponents of up to count found attractors of the catalog,
+# ranked by lyapunov exponent (attractors without estimate last)
+def query_catalog(catalog, m, time, count):
+    return catalog.execute('select string, lyapunov from attractors where m = ? and time = ? and outcome = ? '
+                           'order by lyapunov is null, lyapunov desc, tested limit ?',
+                           (m, time or 0.0, 'found', count)).fetchall()
+
+
+# check all command line arguments, raise ValueError for invalid user input
+def check_arguments(args):
+
+    check_num_points(args.points)
+    check_output_modes(args.output)
+    check_map_mode(args.m)
+    check_sieve(args.jump)
+    check_first_point(args.first)
+    check_interpolate(args.interpolate)
+    check_batch_size(args.batch_size)
+    check_workers(args.workers)
+    check_image(args.image_size, args.gamma)
+    check_chunk_size(args.chunk_size)
+    check_html_points(args.html_points)
+    check_frame_points(args.frame_points)
+    if args.encoder != None:
+        check_encoder(args.encoder)
+    check_ensemble(args.ensemble, args.interpolate)
+    check_tolerance(args.tolerance)
+    check_backend(args.backend)
+    check_cache_size(args.cache_size)
+    check_query(args.query, args.catalog)
+    check_probe(args.probe_length, args.probe_window, args.diversity, args.bound, args.cycle_decimals)
+    check_quality_test(args.min_cells, args.min_dimension)
+
+    if args.seed != None:
+        check_seed(args.seed)
+
+    if args.time != None:
+        check_time(args.time)
+
+    if args.string != '':
+        check_parameter_string(args.string)
+        check_string_length(args.m, args.string)
+
+    if args.atlas != None:
+        check_atlas(args.atlas, args.string, args.atlas_size, args.atlas_tile, args.atlas_score, args.probe_length,
+                    atlas_settings['interval'])
+
+    if args.enumerate:
+        check_enumeration(args.m, args.string, args.prefix, args.range, args.shard, args.checkpoint_interval)
+
+
+# search and plot a single attractor according to map mode, the trajectory is written to the outputs chunk by chunk,
+# count reason of rejection or append parameter string and info of found attractor, add outcome to the catalog.
+# info about the attractor is stored in info (see generate_attractor) with the quality statistics (see track_quality)
+# and the names of the output files. probe_points of search_batch replace the iteration of the probe stage
+# (see generate_attractor)
+def get_attractor(parameter_string, num_points, time, subtitle_string, output_modes, sieve, plot_offset, m, map_function,
+                  interpolate, probe=probe_settings, rejections=None, attractors=None, render=render_settings,
+                  cache=cache_settings, catalog=None, info=None, probe_points=None):
+
+    if info is None:
+        info = {}
+    dim = int(m[0])
+    start = clock.perf_counter()
+    if render['ensemble'] > 1:
+        chunks = generate_ensemble(parameter_string, num_points, time, plot_offset, m, map_function, info, probe,
+                                   render['chunk'], render['ensemble'])
+    elif cache['directory'] != None:
+        chunks = generate_cached_attractor(cache, parameter_string, num_points, time, plot_offset, m, map_function,
+                                           info, probe, render['chunk'], probe_points)
+    else:
+        chunks = generate_attractor(parameter_string, num_points, time, plot_offset, m, map_function, info, probe,
+                                    render['chunk'], probe_points=probe_points)
+    chunks = track_quality(chunks, info, dim, plot_offset, parameter_string, probe)
+
+    # flow mode: refine trajectory (not possible between the chains of ensemble mode)
+    if m[0:2] == '3d' and time != None and render['ensemble'] == 1:
+        chunks = interpolate_chunks(chunks, num_points, plot_offset, interpolate, parameter_string, map_function, time)
+
+    # outputs are opened with the first points to plot and discarded if the attractor is rejected later
+    sinks = None
+    try:
+        for points in select_chunks(chunks, plot_offset, sieve):
+            if render['precision'] != 'float64':
+                points = store_points(points, render['precision'], info)
+            if sinks is None:
+                sinks = get_sinks(dim, output_modes, parameter_string, subtitle_string, render)
+            for output_mode, sink in zip(output_modes, sinks):
+                with profiler.stage('output ' + output_mode):
+                    sink.write(points)
+    except BaseException:
+        for sink in sinks or []:
+            sink.abort()
+        raise
+
+    if catalog != None:
+        record_outcomes(catalog, m, time, [(get_canonical(parameter_string, m, probe['symmetry'])[0], info)])
+    profiler.event(event='attractor', m=m, time=time, string=parameter_string,
+                   outcome=info['reason'][0] if info['reason'] else 'found', iteration=info['iteration'],
+                   lyapunov=info['lyapunov'], quality=info.get('quality'), seconds=clock.perf_counter() - start)
+
+    if info['reason'] != None:
+        for sink in sinks or []:
+            sink.abort()
+        print('attractor', parameter_string, info['reason'][1])
+        if rejections != None:
+            rejections[info['reason'][0]] += 1
+        return False
+
+    if info['lyapunov'] != None:
+        print('attractor {} lyapunov exponent {:.4f}'.format(parameter_string, info['lyapunov']))
+    print('attractor {} {}'.format(parameter_string, format_quality(info['quality'])))
+    if attractors != None:
+        attractors.append((parameter_string, info))
+
+    if sinks is None:
+        sinks = get_sinks(dim, output_modes, parameter_string, subtitle_string, render)
+    for output_mode, sink in zip(output_modes, sinks):
+        with profiler.stage('output ' + output_mode):
+            sink.close()
+    info['outputs'] = [sink.filename for sink in sinks]
+    if info.get('rounding') != None:
+        print('attractor {} {}'.format(parameter_string, format_rounding(info, render['precision'], render['size'])))
+
+    # return success
+    return True
+
+
+# format number of rejections per stage (rejections of the quality test and number of skipped parameter strings
+# of the catalog and of the symmetry group only if there are any)
+def format_rejections(rejections):
+    stages = ['bounds', 'diversity', 'chaos', 'cycle'] + [stage for stage in ('quality', 'known', 'symmetric')
+                                                          if rejections[stage]]
+    return ', '.join('{} {}'.format(rejections[stage], stage) for stage in stages)
+
+
+# search seeded random attractors with index start to stop - 1 (runs in worker processes),
+# without seed the strings with index start to stop - 1 of the enumeration mode are searched (see get_indexed_string),
+# parameter strings of the catalog are skipped. found attractors are plotted in the worker if outputs are given
+# (dict of output modes, sieve, interpolate and settings of render and cache like get_attractor), the printed
+# messages are returned. return parameter strings of found attractors, number of rejections per stage, outcomes of
+# tested attractors (for the catalog, otherwise None), parameter strings and info of found attractors, messages
+# and metrics of the profiler (None if disabled, see Profiler.collect)
+def search_seeded_attractors(m, time, num_points, plot_offset, seed, batch_size, probe, catalog_file, outputs,
+                             guess_range):
+
+    map_function = get_map_function(m)
+    if seed != None:
+        strings = get_seeded_strings(coeff, int(m[3:]), seed, *guess_range)
+    else:
+        strings = get_indexed_strings(coeff, int(m[3:]), *guess_range)
+    rejections = collections.Counter()
+    strings = skip_symmetric(strings, m, probe, rejections)
+    outcomes = None
+
+    # skip known candidates
+    if catalog_file != None:
+        catalog = open_catalog(catalog_file)
+        known = get_known_strings(catalog, m, time, strings)
+        catalog.close()
+
+        rejections['known'] += sum(string in known for string in strings)
+        strings = [string for string in strings if string not in known]
+        outcomes = []
+
+    # probe candidates simultaneously
+    trajectories = {}
+    if batch_size > 0:
+        strings, batch_rejections = search_batch(strings, int(m[0]), time, num_points + plot_offset - 1, map_function,
+                                                 probe, outcomes, trajectories)
+        rejections.update(batch_rejections)
+
+    # iterate (and plot) remaining candidates, continue the probe points of the batch
+    attractors = []
+    messages = io.StringIO()
+    for parameter_string in strings:
+        if outputs != None:
+            info = {}
+            with contextlib.redirect_stdout(messages):
+                print('Search for attractor {}:'.format(parameter_string), end=' ')
+                get_attractor(parameter_string, num_points, time, 'created with PyStrange', outputs['modes'],
+                              outputs['sieve'], plot_offset, m, map_function, outputs['interpolate'], probe,
+                              render=outputs['render'], cache=outputs['cache'], info=info,
+                              probe_points=trajectories.get(parameter_string))
+        else:
+            info = check_attractor(parameter_string, num_points, time, plot_offset, m, map_function, probe,
+                                   trajectories.get(parameter_string))
+
+        if info['reason'] != None:
+            rejections[info['reason'][0]] += 1
+        else:
+            attractors.append((parameter_string, info))
+        if outcomes != None:
+            outcomes.append((parameter_string, info))
+
+    found = [parameter_string for parameter_string, info in attractors]
+    return found, rejections, outcomes, attractors, messages.getvalue(), profiler.collect()
+
+
+# search seeded random attractors (or enumerated attractors without seed) with index start to num_guesses - 1
+# in chunks of guesses spread over worker processes (see search_seeded_attractors, found attractors are plotted
+# by the workers if outputs are given), yield the range of guesses (first, last) and the results of every chunk
+# in order (the metrics of the profiler are merged). the chunks are submitted in windows of window chunks
+# per worker, so huge ranges of the enumeration need constant memory
+def search_seeded_chunks(m, time, num_guesses, num_points, plot_offset, seed, batch_size=0, workers=1,
+                         probe=probe_settings, catalog_file=None, start=0, window=16, outputs=None):
+
+    chunk_size = batch_size if batch_size > 0 else 100
+    guess_ranges = ((first, min(first + chunk_size, num_guesses)) for first in range(start, num_guesses, chunk_size))
+    search = functools.partial(search_seeded_attractors, m, time, num_points, plot_offset, seed, batch_size,
+                               probe, catalog_file, outputs)
+
+    pool = multiprocessing.Pool(workers, enable_worker_profiler, (profiler.enabled,)) if workers > 1 else None
+    try:
+        while True:
+            ranges = list(itertools.islice(guess_ranges, workers * window))
+            if not ranges:
+                break
+            results = pool.imap(search, ranges) if pool else (search(r) for r in ranges)
+            for guess_range, (strings, rejections, outcomes, attractors, messages, metrics) in zip(ranges, results):
+                profiler.merge(metrics)
+                yield guess_range, (strings, rejections, outcomes, attractors, messages)
+    finally:
+        if pool:
+            pool.terminate()
+
+
+# get index range of the enumeration mode for strings with n letters (see get_indexed_string): the given range,
+# the strings starting with prefix or all strings, part i of count parts of (almost) equal size for shard (i, count)
+def get_enumeration_range(n, prefix='', index_range=None, shard=(0, 1)):
+
+    if index_range != None:
+        start, stop = index_range
+    else:
+        start = get_string_index(coeff, prefix.ljust(n, 'A'))
+        stop = start + len(coeff)**(n - len(prefix))
+
+    i, count = shard
+    return start + (stop - start) * i // count, start + (stop - start) * (i + 1) // count
+
+
+# read checkpoint of the enumeration mode (next index, found attractors and rejections per stage),
+# return a new checkpoint if the file does not exist, raise ValueError if it was written with other settings
+def read_checkpoint(filename, settings):
+
+    checkpoint = {'settings': settings, 'next': settings['range'][0], 'found': [], 'rejections': {}}
+    if filename != None and os.path.exists(filename):
+        with open(filename) as infile:
+            saved = json.load(infile)
+        if saved['settings'] != json.loads(json.dumps(settings)):
+            raise ValueError('checkpoint "{}" was written with other settings: {}'.format(filename, saved['settings']))
+        checkpoint.update(saved)
+
+    return checkpoint
+
+
+# write checkpoint of the enumeration mode, the file is replaced at once so a crash leaves the last checkpoint
+def write_checkpoint(filename, checkpoint):
+
+    with open(filename + '.tmp', 'w') as outfile:
+        json.dump(checkpoint, outfile, default=int)
+    os.replace(filename + '.tmp', filename)
+
+
+# create random attractors, with a catalog (sqlite database) known parameter strings are skipped
+# and all outcomes are added. query mode renders the query best attractors of the catalog,
+# enumeration mode searches all strings of an index range (see enumeration_settings)
+def get_attractors(num_guesses, parameter_string, num_points, time, output_modes, sieve, plot_offset, m, interpolate,
+                   batch_size=0, workers=1, seed=None, probe=probe_settings, render=render_settings,
+                   cache=cache_settings, catalog_file=None, query=0, enumeration=None):
+    attractors = []
+    rejections = collections.Counter()
     map = get_map_function(m)
     subtitle_string = 'created with PyStrange'
-    
-    # 2d attractor(s)
-    if m[0:2] == '2d':
-        
-        if time != None:
-            print('ignoring time intervall for 2D attractors')
+    outputs = {'modes': output_modes, 'sieve': sieve, 'interpolate': interpolate, 'render': render, 'cache': cache}
+
+    if m[0:2] == '2d' and time != None:
+        print('ignoring time intervall for 2D attractors')
+        time = None
+
+    catalog = open_catalog(catalog_file) if catalog_file != None else None
+    try:
 
         # single search mode
         if parameter_string != '':
             print('Search for attractor {}:'.format(parameter_string), end=' ')
-            if get_attractor_2d_map(parameter_string, num_points, 
-                                subtitle_string, output_modes, sieve, plot_offset, map):
-                found += 1  
+            get_attractor(parameter_string, num_points, time, subtitle_string, output_modes, sieve, plot_offset,
+                          m, map, interpolate, probe, attractors=attractors, render=render, cache=cache,
+                          catalog=catalog)
+
+        # query mode
+        elif query > 0:
+            ranking = query_catalog(catalog, m, time, query)
+            print('Render {} attractor(s) of the catalog'.format(len(ranking)))
+            for string, lyapunov in ranking:
+                print('Search for attractor {}:'.format(string), end=' ')
+                get_attractor(string, num_points, time, subtitle_string, output_modes, sieve, plot_offset,
+                              m, map, interpolate, probe, attractors=attractors, render=render, cache=cache)
+
+        # enumeration mode: strings with index start to stop - 1 in chunks spread over worker processes,
+        # the next index and the found attractors are saved to the checkpoint file at intervals and at the end
+        elif enumeration != None:
+            start, stop = enumeration['range']
+            n = int(m[3:])
+            settings = {'m': m, 'time': time, 'range': [start, stop], 'points': num_points, 'first': plot_offset,
+                        'probe': {key: value for key, value in probe.items() if key != 'backend'}}
+            checkpoint = read_checkpoint(enumeration['checkpoint'], settings)
+            rejections.update(checkpoint['rejections'])
+            print('Enumerate attractors {} to {} ({} to {}) on {} worker(s)'
+                  .format(start, stop - 1, get_indexed_string(coeff, n, start), get_indexed_string(coeff, n, stop - 1),
+                          workers))
+            if checkpoint['next'] > start:
+                print('Resume at attractor {} ({}) with {} attractor(s) found'
+                      .format(checkpoint['next'], get_indexed_string(coeff, n, min(checkpoint['next'], stop - 1)),
+                              len(checkpoint['found'])))
+
+            saved = clock.monotonic()
+            try:
+                for (first, last), (strings, chunk_rejections, outcomes, chunk_attractors, messages) in \
+                        search_seeded_chunks(m, time, stop, num_points, plot_offset, None, batch_size, workers, probe,
+                                             catalog_file, checkpoint['next'], outputs=outputs):
+                    rejections.update(chunk_rejections)
+                    print('Enumerated attractors {} to {} of {} to {}: rejected {}, {} found'
+                          .format(first, last - 1, start, stop - 1, format_rejections(chunk_rejections), len(strings)))
+                    profiler.event(event='batch', first=first, last=last, rejections=chunk_rejections, found=strings)
+                    print(messages, end='')
+                    attractors.extend(chunk_attractors)
+                    if catalog != None:
+                        record_outcomes(catalog, m, time, outcomes)
+                        catalog.commit()
+
+                    checkpoint.update(next=last, found=checkpoint['found'] + strings, rejections=dict(rejections))
+                    if enumeration['checkpoint'] != None and clock.monotonic() - saved >= enumeration['interval']:
+                        write_checkpoint(enumeration['checkpoint'], checkpoint)
+                        saved = clock.monotonic()
+            finally:
+                if enumeration['checkpoint'] != None:
+                    write_checkpoint(enumeration['checkpoint'], checkpoint)
+
+        # random search mode with seeded random streams, guesses are spread over worker processes
+        elif workers > 1 or seed != None:
+            if seed == None:
+                seed = random.SystemRandom().randrange(2**32)
+            print('Random search with seed {} on {} worker(s)'.format(seed, workers))
+
+            # print progress and messages of the found attractors (plotted by the workers) in order
+            for (first, last), (strings, chunk_rejections, outcomes, chunk_attractors, messages) in \
+                    search_seeded_chunks(m, time, num_guesses, num_points, plot_offset, seed, batch_size, workers,
+                                         probe, catalog_file, outputs=outputs):
+                rejections.update(chunk_rejections)
+                print('Random attractors {} to {} of {}: rejected {}, {} found'
+                      .format(first + 1, last, num_guesses, format_rejections(chunk_rejections), len(strings)))
+                profiler.event(event='batch', first=first, last=last, rejections=chunk_rejections, found=strings)
+                print(messages, end='')
+                attractors.extend(chunk_attractors)
+                if catalog != None:
+                    record_outcomes(catalog, m, time, outcomes)
+                    catalog.commit()
+
+        # random search mode, batches of candidates are probed simultaneously
+        elif batch_size > 0:
+            for first in range(0, num_guesses, batch_size):
+                strings = get_random_strings(coeff, int(m[3:]), min(batch_size, num_guesses - first))
+                strings = skip_symmetric(strings, m, probe, rejections)
+                outcomes = None
+
+                # skip known candidates
+                if catalog != None:
+                    known = get_known_strings(catalog, m, time, strings)
+                    rejections['known'] += sum(string in known for string in strings)
+                    strings = [string for string in strings if string not in known]
+                    outcomes = []
+
+                trajectories = {}
+                survivors, batch_rejections = search_batch(strings, int(m[0]), time, num_points + plot_offset - 1,
+                                                           map, probe, outcomes, trajectories)
+                rejections.update(batch_rejections)
+                print('Random attractors {} to {} of {}: rejected {}, {} survivors'
+                      .format(first + 1, first + min(batch_size, num_guesses - first), num_guesses,
+                              format_rejections(batch_rejections), len(survivors)))
+                profiler.event(event='batch', first=first, last=first + len(strings), rejections=batch_rejections,
+                               survivors=survivors)
+
+                # iterate and plot survivors, continue the probe points of the batch
+                for survivor in survivors:
+                    print('Search for attractor {}:'.format(survivor), end=' ')
+                    get_attractor(survivor, num_points, time, subtitle_string, output_modes, sieve, plot_offset,
+                                  m, map, interpolate, probe, rejections, attractors, render, cache, catalog,
+                                  probe_points=trajectories.get(survivor))
+                if catalog != None:
+                    record_outcomes(catalog, m, time, outcomes)
+                    catalog.commit()
 
         # random search mode
         else:
-            # search for random attractors
             for i in range(num_guesses):
                 print('Random attractor {} of {}:'.format(i + 1, num_guesses), end=' ')
-                if get_attractor_2d_map(get_random_string(coeff, int(m[3:])), num_points, 
-                                    subtitle_string, output_modes, sieve, plot_offset, map):
-                    found += 1
-
-    # 3d attractor(s)            
-    elif m[0:2] == '3d':
-
-        # single search mode
-        if parameter_string != '':
-
-            # map mode
-            if time == None:
-                print('Search for attractor {}:'.format(parameter_string), end=' ')
-                if get_attractor_3d_map(parameter_string, num_points, 
-                                    subtitle_string, output_modes, sieve, plot_offset, map):
-                    found += 1
-
-            # flow mode
-            else:
-                print('Search for attractor {}:'.format(parameter_string), end=' ')
-                if get_attractor_3d_flow(parameter_string, time, num_points, 
-                                    subtitle_string, output_modes, sieve, plot_offset, map, interpolate):
-                    found += 1
-
-        # random search mode
-        else:
-
-            # map mode
-            if time == None:
-                # search for random attractors
-                for i in range(num_guesses):
-                    print('Random attractor {} of {}:'.format(i + 1, num_guesses), end=' ')
-                    if get_attractor_3d_map(get_random_string(coeff, int(m[3:])), num_points, 
-                                        subtitle_string, output_modes, sieve, plot_offset, map):
-                        found += 1
+                string = get_random_string(coeff, int(m[3:]))
+
+                # skip symmetric and known candidates
+                if not skip_symmetric([string], m, probe, rejections):
+                    print('attractor {} is symmetric to {}'.format(string, get_canonical(string, m, probe['symmetry'])[0]))
+                    continue
+                if catalog != None and get_known_strings(catalog, m, time, [string]):
+                    print('attractor {} already in catalog'.format(string))
+                    rejections['known'] += 1
+                    continue
+
+                get_attractor(string, num_points, time, subtitle_string, output_modes,
+                              sieve, plot_offset, m, map, interpolate, probe, rejections, attractors, render, cache,
+                              catalog)
+                if catalog != None and (i + 1) % 1000 == 0:
+                    catalog.commit()
+
+    finally:
+        if catalog != None:
+            catalog.commit()
+            catalog.close()
+
+    # print reasons of rejection, ranking and number of found attractors
+    if parameter_string == '' and query == 0:
+        print('Rejected attractors: {}'.format(format_rejections(rejections)))
+
+        ranking = sorted((info['lyapunov'], string) for string, info in attractors if info['lyapunov'] != None)
+        if ranking:
+            print('Attractors ranked by lyapunov exponent:')
+            for lyapunov, string in reversed(ranking):
+                print('{:9.4f} {}'.format(lyapunov, string))
+
+    found = len(attractors)
 
-            # flow mode
-            else:
-                # search for random attractors
-                for i in range(num_guesses):
-                    print('Random attractor {} of {}:'.format(i + 1, num_guesses), end=' ')
-                    if get_attractor_3d_flow(get_random_string(coeff, int(m[3:])), time, num_points, 
-                                        subtitle_string, output_modes, sieve, plot_offset, map, interpolate):
-                        found += 1                        
-
-    # print number of found attractors
     if found == 0:
         print('No attractor has been found - better luck next time!')
     elif found == 1:
@@ -560,18 +3000,328 @@ def get_attractors(num_guesses, parameter_string, num_points, time, output_modes
         print(found, 'attractors have been found')
 
 
+# get coefficient matrix of the pixels of a tile of the atlas: the coefficients of the base parameter string with
+# coefficient indices[0] varied along x and indices[1] along y (continuous values of the coordinates)
+def get_atlas_coefficients(base_string, indices, x, y):
+
+    c = np.repeat(np.array(get_coefficient(base_string, coeff), dtype=float)[:, None], len(x), axis=1)
+    c[indices[0]] = x
+    c[indices[1]] = y
+
+    return c
+
+
+# calculate scores of a batch of coefficient sets (coefficient matrix with one column per set) like the probe stage
+# of search_batch: iteration out of bounds (probe length if the set stays in bounds), lyapunov exponent of the second
+# half of the probe (-inf out of bounds) or maximal number of different values in the probe window (0 out of bounds)
+def score_batch(c, dim, time, map_function, score, probe=probe_settings, distance=1e-8, interval=10):
+
+    c = get_coefficient_rows(c, dim)
+    scores = np.full(c.shape[-1], {'escape': float(probe['length']), 'lyapunov': -math.inf, 'diversity': 0.0}[score])
+    alive = np.arange(c.shape[-1])
+    length = probe['length']
+    first = length - probe['window'] + 1
+    tracking = length // 2
+
+    state = [np.full(len(alive), start_value) for k in range(dim)]
+    window = np.empty((dim, probe['window'], len(alive)))
+    shadow = None
+    total = np.zeros(len(alive))
+
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        for i in range(length):
+            state = map_function(*state, c) if time == None else step_flow(state, c, map_function, time, probe)
+
+            # shadow trajectory renormalized to distance every interval iterations
+            if score == 'lyapunov' and i >= tracking:
+                if shadow is None:
+                    shadow = [values + distance / math.sqrt(dim) for values in state]
+                else:
+                    shadow = map_function(*shadow, c) if time == None else \
+                        step_flow(shadow, c, map_function, time, probe)
+                    if (i - tracking) % interval == 0:
+                        delta = [s - v for s, v in zip(shadow, state)]
+                        separation = np.sqrt(sum(d * d for d in delta))
+                        separation = np.where(separation > 0, separation, distance * distance)
+                        total += np.log(separation / distance)
+                        shadow = [v + distance * d / separation for v, d in zip(state, delta)]
+
+            if score == 'diversity' and i + 1 >= first:
+                for k in range(dim):
+                    window[k, i + 1 - first] = state[k]
+
+            # values out of bounds -> drop sets
+            inside = np.ones(len(alive), dtype=bool)
+            for values in state:
+                inside &= np.abs(values) <= probe['bound']
+            if not inside.all():
+                if score == 'escape':
+                    scores[alive[~inside]] = i
+                alive = alive[inside]
+                c = c[..., inside]
+                state = [values[inside] for values in state]
+                window = window[:, :, inside]
+                total = total[inside]
+                if shadow is not None:
+                    shadow = [values[inside] for values in shadow]
+            if len(alive) == 0:
+                break
+
+    if score == 'lyapunov' and len(alive) > 0:
+        scores[alive] = total / ((length - 1 - tracking) // interval * interval)
+    elif score == 'diversity':
+        for k in range(len(alive)):
+            scores[alive[k]] = max(count_diversity(dim, window[0, :, k], window[1, :, k], window[-1, :, k]))
+
+    return scores
+
+
+# calculate scores of the pixels of a tile of the atlas (runs in worker processes), return tile and scores
+# (array of shape tile height x tile width, row 0 at the lower bound of the y range)
+def compute_atlas_tile(m, time, base_string, indices, ranges, size, score, interval, probe, tile):
+
+    row, column, height, width = tile
+    x = np.linspace(ranges[0], ranges[1], size)[column:column + width]
+    y = np.linspace(ranges[2], ranges[3], size)[row:row + height]
+    xx, yy = np.meshgrid(x, y)
+
+    with profiler.stage('atlas tile'):
+        scores = score_batch(get_atlas_coefficients(base_string, indices, xx.ravel(), yy.ravel()), int(m[0]), time,
+                             get_map_function(m), score, probe, interval=interval)
+
+    return tile, scores.reshape(height, width), profiler.collect()
+
+
+# get rgb image of the scores of the atlas (white: low score or not calculated, color: high score)
+def get_atlas_image(scores, score, color=(0x4c, 0x72, 0xb0)):
+
+    values = np.where(np.isfinite(scores), scores, 0)
+    if score == 'lyapunov':
+        values = np.maximum(values, 0)
+
+    return tone_map(values[::-1], 'gamma', 1, color)
+
+
+# atlas mode: calculate scores of a size x size grid of coefficient sets (base parameter string with the coefficients
+# indices varied over the ranges xmin, xmax, ymin, ymax) tile by tile on worker processes, the raw scores are
+# stored in a memory mapped npy file after every tile (not calculated pixels are nan), so an interrupted atlas is
+# resumed by running it again with the same settings (including the probe settings used by score_batch).
+# the scores are saved as png image
+def render_atlas(m, time, base_string, indices, ranges, workers=1, probe=probe_settings, atlas=atlas_settings):
+
+    size, tile_size, score = atlas['size'], atlas['tile'], atlas['score']
+    name = 'Atlas {} {} {} {}'.format(base_string, indices[0], indices[1], score)
+    settings = {'m': m, 'time': time, 'string': base_string, 'indices': list(indices), 'ranges': list(ranges),
+                'size': size, 'score': score, 'interval': atlas['interval']}
+    settings.update((key, probe[key]) for key in ('length', 'window', 'threshold', 'bound', 'integrator', 'tolerance'))
+
+    if os.path.exists(name + '.npy') and os.path.exists(name + '.json'):
+        with open(name + '.json') as infile:
+            if json.load(infile) != settings:
+                raise ValueError('atlas {} exists with other settings'.format(name))
+        scores = np.lib.format.open_memmap(name + '.npy', mode='r+')
+    else:
+        with open(name + '.json', 'w') as outfile:
+            json.dump(settings, outfile)
+        scores = np.lib.format.open_memmap(name + '.npy', mode='w+', dtype=float, shape=(size, size))
+        scores[:] = np.nan
+
+    tiles = [(row, column, min(tile_size, size - row), min(tile_size, size - column))
+             for row in range(0, size, tile_size) for column in range(0, size, tile_size)
+             if np.isnan(scores[row:row + tile_size, column:column + tile_size]).any()]
+    print('Atlas of coefficients {} and {} of {}: {} of {} tiles to calculate'
+          .format(indices[0], indices[1], base_string, len(tiles), math.ceil(size / tile_size)**2))
+
+    compute = functools.partial(compute_atlas_tile, m, time, base_string, indices, ranges, size, score,
+                                atlas['interval'], probe)
+    pool = multiprocessing.Pool(workers, enable_worker_profiler, (profiler.enabled,)) if workers > 1 else None
+    try:
+        results = pool.imap_unordered(compute, tiles) if pool else (compute(tile) for tile in tiles)
+        for k, ((row, column, height, width), values, metrics) in enumerate(results):
+            profiler.merge(metrics)
+            scores[row:row + height, column:column + width] = values
+            scores.flush()
+            print('tile {} of {} done'.format(k + 1, len(tiles)))
+    finally:
+        if pool:
+            pool.terminate()
+
+    write_png(name + '.png', get_atlas_image(scores, score))
+    print('atlas saved to {}.png and {}.npy'.format(name, name))
+
+
+# read items of batch render mode from a list file ("-" for stdin): one parameter string per line, optionally with
+# map mode and options as name=value (see batch_options, several outputs separated by commas), other options are
+# taken from defaults (dict with map mode "m" and the options). "#" starts a comment.
+# return list of items (dicts like defaults with parameter string "string"), invalid items raise ValueError
+def read_batch_list(filename, defaults):
+
+    infile = sys.stdin if filename == '-' else open(filename)
+    items = []
+    try:
+        for number, line in enumerate(infile, 1):
+            tokens = line.split('#')[0].split()
+            if not tokens:
+                continue
+
+            item = dict(defaults, string=None)
+            try:
+                for token in tokens:
+                    name, separator, value = token.partition('=')
+                    if separator:
+                        if name not in batch_options:
+                            raise ValueError('unknown option "{}"'.format(name))
+                        item[name] = batch_options[name](value)
+                    elif get_map_degree(token) != None:
+                        item['m'] = token
+                    else:
+                        item['string'] = token
+
+                if item['string'] == None:
+                    raise ValueError('parameter string missing')
+                check_map_mode(item['m'])
+                check_parameter_string(item['string'])
+                check_string_length(item['m'], item['string'])
+                check_num_points(item['points'])
+                check_first_point(item['first'])
+                check_sieve(item['jump'])
+                check_interpolate(item['interpolate'])
+                check_output_modes(item['output'])
+                if item['time'] != None:
+                    check_time(item['time'])
+            except ValueError as error:
+                raise ValueError('{} line {}: {}'.format(filename, number, error))
+
+            items.append(item)
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+
+    return items
+
+
+# render one item of batch render mode (runs in worker processes), return entry of the manifest,
+# the printed messages (printed in order by render_batch) and metrics of the profiler (None if disabled,
+# see Profiler.collect)
+def render_batch_item(probe, render, cache, item):
+
+    info = {}
+    start = clock.perf_counter()
+    time = item['time'] if item['m'][0:2] == '3d' else None
+
+    messages = io.StringIO()
+    with contextlib.redirect_stdout(messages):
+        print('Search for attractor {}:'.format(item['string']), end=' ')
+        get_attractor(item['string'], item['points'], time, 'created with PyStrange', item['output'], item['jump'],
+                      item['first'], item['m'], get_map_function(item['m']), item['interpolate'], probe,
+                      render=render, cache=cache, info=info)
+
+    entry = dict(item, time=time, outcome=info['reason'][0] if info['reason'] else 'found',
+                 message=info['reason'][1] if info['reason'] else None, lyapunov=info['lyapunov'],
+                 quality=info.get('quality'), outputs=info.get('outputs', []), rounding=info.get('rounding'),
+                 seconds=clock.perf_counter() - start)
+
+    return entry, messages.getvalue(), profiler.collect()
+
+
+# batch render mode: render items (see read_batch_list) in one process or a pool of worker processes,
+# every process imports the plotting libraries and creates its figures once. the messages of the items are printed
+# and the entries of the manifest (item, outcome, lyapunov exponent, names of the output files) are written
+# in order as json lines
+def render_batch(items, manifest_file, workers=1, probe=probe_settings, render=render_settings, cache=cache_settings):
+
+    found = 0
+    render_item = functools.partial(render_batch_item, probe, render, cache)
+    pool = multiprocessing.Pool(workers, enable_worker_profiler, (profiler.enabled,)) if workers > 1 else None
+    try:
+        results = pool.imap(render_item, items) if pool else (render_item(item) for item in items)
+        with open(manifest_file, 'w') as manifest:
+            for entry, messages, metrics in results:
+                profiler.merge(metrics)
+                print(messages, end='')
+                manifest.write(json.dumps(entry, default=int) + '\n')
+                manifest.flush()
+                found += entry['outcome'] == 'found'
+    finally:
+        if pool:
+            pool.terminate()
+
+    print('{} of {} attractors rendered, manifest saved to {}'.format(found, len(items), manifest_file))
+
+
+# library api: calculate attractor of map mode m ("2d_N" or "3d_N") with parameter string like single search mode,
+# return points to plot as array of shape (dim, n) (or None if the attractor is rejected) and info about the attractor
+# (see generate_attractor and track_quality). points, time, first, jump, interpolate, ensemble and precision are
+# the options -p, -t, -f, -j, -i, --ensemble and --precision, the points are a view of an interleaved array of shape
+# (n, dim) with the precision (info['rounding']: largest rounding error). invalid arguments raise ValueError
+def compute_attractor(m, parameter_string, points=20000, time=None, first=200, jump=1, interpolate=1,
+                      probe=probe_settings, ensemble=1, precision='float64'):
+
+    check_map_mode(m)
+    check_parameter_string(parameter_string)
+    check_string_length(m, parameter_string)
+    check_num_points(points)
+    check_first_point(first)
+    check_sieve(jump)
+    check_interpolate(interpolate)
+    check_ensemble(ensemble, interpolate)
+    check_precision(precision)
+    if time != None:
+        check_time(time)
+
+    if m[0:2] == '2d':
+        time = None
+
+    info = {}
+    if ensemble > 1:
+        chunks = generate_ensemble(parameter_string, points, time, first, m, get_map_function(m), info, probe,
+                                   ensemble=ensemble)
+    else:
+        chunks = generate_attractor(parameter_string, points, time, first, m, get_map_function(m), info, probe)
+    chunks = track_quality(chunks, info, int(m[0]), first, parameter_string, probe)
+    if time != None and ensemble == 1:
+        chunks = interpolate_chunks(chunks, points, first, interpolate, parameter_string, get_map_function(m), time)
+
+    selected = [store_points(chunk, precision, info).T for chunk in select_chunks(chunks, first, jump)]
+    if info['reason'] != None:
+        return None, info
+
+    return np.concatenate(selected).T if selected else np.empty((int(m[0]), 0), dtype=precision), info
+
+
+# library api: search number random attractors of map mode m without plotting like random search mode with seed,
+# return parameter strings of found attractors and number of rejections per stage. points, time, first, seed,
+# batch_size, workers and catalog_file are the options -p, -t, -f, --seed, -b, -w and --catalog (the catalog is
+# only read), the same seed finds the same attractors. invalid arguments raise ValueError
+def search_attractors(m, number=100, points=20000, time=None, first=200, seed=0, batch_size=0, workers=1,
+                      probe=probe_settings, catalog_file=None):
+
+    check_map_mode(m)
+    check_num_guesses(number)
+    check_num_points(points)
+    check_first_point(first)
+    check_seed(seed)
+    check_batch_size(batch_size)
+    check_workers(workers)
+    if time != None:
+        check_time(time)
+
+    if m[0:2] == '2d':
+        time = None
+
+    found = []
+    rejections = collections.Counter()
+    for guess_range, (strings, chunk_rejections, outcomes, attractors, messages) in \
+            search_seeded_chunks(m, time, number, points, first, seed, batch_size, workers, probe, catalog_file):
+        found.extend(strings)
+        rejections.update(chunk_rejections)
+
+    return found, rejections
+
+
 # get map function
 def get_map_function(m):
-    if m == '3d_30':
-        return map_3d_30
-    elif m == '3d_60':
-        return map_3d_60
-    elif m == '3d_105':
-        return map_3d_105
-    elif m == '2d_12':
-        return map_2d_12 
-    elif m == '2d_20':
-        return map_2d_20
+    return get_polynomial_map(int(m[0]), get_map_degree(m))
 
 
 # main function
@@ -582,7 +3332,7 @@ def main():
     
     # define positional argument
     parser.add_argument('m', type=str, 
-                        help='map to be used: "3d_30" or "3d_60" or "2d_12" or "2d_20"')
+                        help='map to be used: "3d_30" or "3d_60" or "3d_105" or "2d_12" or "2d_20" or any "2d_N"/"3d_N" polynomial map')
     
     # define optional arguments
     parser.add_argument('-n', '--number', type=int, default=100, 
@@ -594,34 +3344,209 @@ def main():
     parser.add_argument('-s', '--string', type=str, default='', 
                         help='parameter string: string with 12 or 30 capital letters, default: "", "-n" will be ignored')
     parser.add_argument('-o', '--output', type=str, default=['png',], nargs='*',
-                        help='output format: "png" ( via matplotlib) and/or "html" (via plotly) and/or "obj" (wavefront), default: "png"')
+                        help='output format: "png" (density image or via matplotlib) and/or "html" (via plotly) and/or "frames" '
+                        '(animation) and/or "obj" (wavefront) and/or "ply" (binary) and/or "npy" (numpy), default: "png"')
     parser.add_argument('-j', '--jump', type=int, default=1, 
                         help='plot every J\'th point: integer >= 1, default: 1')
     parser.add_argument('-f', '--first', type=int, default=200, 
                         help='start plotting at index F: integer >= 0, default: 200')    
     parser.add_argument('-i', '--interpolate', type=int, default=1, 
                         help='interploation factor, default: 1') 
+    parser.add_argument('-b', '--batch-size', type=int, default=0,
+                        help='probe B random attractors simultaneously before full iteration: integer >= 0, default: 0 (off)')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='number of worker processes for random search: integer >= 1, default: 1')
+    parser.add_argument('--probe-length', type=int, default=probe_settings['length'],
+                        help='iterations of the probe stage before full size arrays are allocated, default: {}'
+                        .format(probe_settings['length']))
+    parser.add_argument('--probe-window', type=int, default=probe_settings['window'],
+                        help='number of last probe points tested for diversity and chaos, default: {}'
+                        .format(probe_settings['window']))
+    parser.add_argument('--diversity', type=int, default=probe_settings['threshold'],
+                        help='minimal number of different values in the probe window, default: {}'
+                        .format(probe_settings['threshold']))
+    parser.add_argument('--bound', type=float, default=probe_settings['bound'],
+                        help='maximal absolute value of the coordinates, default: {}'.format(probe_settings['bound']))
+    parser.add_argument('--min-lyapunov', type=float,
+                        help='minimal lyapunov exponent (per iteration) in the probe window, default: no chaos test')
+    parser.add_argument('--lyapunov', action='store_true',
+                        help='estimate largest lyapunov exponent of found attractors and rank them (slower)')
+    parser.add_argument('--min-cells', type=int,
+                        help='minimal number of occupied cells of a grid of {} cells around the attractor, tested while '
+                        'iterating (from 10 points per cell) and at the end, default: no test'
+                        .format(quality_settings['cells']))
+    parser.add_argument('--min-dimension', type=float,
+                        help='minimal correlation dimension of the attractor (estimated from a sample of {} points), '
+                        'default: no test'.format(quality_settings['sample']))
+    parser.add_argument('--cycle-decimals', type=int, default=probe_settings['cycle'],
+                        help='decimals of the rounded states for detection of periodic orbits, default: {}'
+                        .format(probe_settings['cycle']))
+    parser.add_argument('--integrator', type=str, default=probe_settings['integrator'], choices=['euler', 'rk4', 'rk45'],
+                        help='integrator of flow mode: "euler", "rk4" or adaptive "rk45" (allows larger "-t"), default: "{}"'
+                        .format(probe_settings['integrator']))
+    parser.add_argument('--tolerance', type=float, default=probe_settings['tolerance'],
+                        help='absolute and relative tolerance of integrator "rk45", default: {}'
+                        .format(probe_settings['tolerance']))
+    parser.add_argument('--backend', type=str, default=probe_settings['backend'], choices=['auto', 'numba', 'numpy'],
+                        help='backend of the iteration: compiled "numba" kernels, "numpy" or "auto" (numba if it is '
+                        'installed), default: "{}"'.format(probe_settings['backend']))
+    parser.add_argument('--symmetry', type=str, default=probe_settings['symmetry'], choices=['none', 'permute', 'full'],
+                        help='skip parameter strings symmetric to a smaller one: "permute" (permutations of the coordinates) '
+                        'or "full" (also sign flips), catalog and cache use the canonical strings, default: "{}"'
+                        .format(probe_settings['symmetry']))
+    parser.add_argument('--renderer', type=str, default=render_settings['renderer'], choices=['density', 'scatter'],
+                        help='renderer for png output: "density" image or matplotlib "scatter" plot, default: "{}"'
+                        .format(render_settings['renderer']))
+    parser.add_argument('--image-size', type=int, default=render_settings['size'],
+                        help='width and height of density images in pixels, default: {}'.format(render_settings['size']))
+    parser.add_argument('--tone', type=str, default=render_settings['tone'], choices=['log', 'gamma'],
+                        help='tone mapping of density images: "log" or "gamma", default: "{}"'
+                        .format(render_settings['tone']))
+    parser.add_argument('--gamma', type=float, default=render_settings['gamma'],
+                        help='gamma of tone mapping "gamma", default: {}'.format(render_settings['gamma']))
+    parser.add_argument('--html-points', type=int, default=render_settings['budget'],
+                        help='maximal number of points of html output, thinned out on a grid preserving the coverage, '
+                        '0: all points, default: {}'.format(render_settings['budget']))
+    parser.add_argument('--plotlyjs', type=str, default=render_settings['plotlyjs'], choices=['directory', 'cdn', 'inline'],
+                        help='plotly.js of html output: shared file "plotly.min.js" in the output "directory", '
+                        'loaded from "cdn" or "inline" in every file, default: "{}"'.format(render_settings['plotlyjs']))
+    parser.add_argument('--ensemble', type=int, default=render_settings['ensemble'],
+                        help='number of chains of ensemble mode: the points of an attractor are calculated by K chains '
+                        'advancing together, default: {} (single trajectory)'.format(render_settings['ensemble']))
+    parser.add_argument('--frame-points', type=int, default=render_settings['frame'],
+                        help='number of new points per frame of output "frames", default: {}'.format(render_settings['frame']))
+    parser.add_argument('--encoder', type=str,
+                        help='command encoding the frames of output "frames" from a png stream on its standard input '
+                        '("{}" is replaced by the name of the attractor), e.g. '
+                        '"ffmpeg -y -f image2pipe -framerate 30 -i - \'{}.mp4\'", default: png files in a directory')
+    parser.add_argument('--precision', type=str, default=render_settings['precision'],
+                        choices=['float64', 'float32', 'float16'],
+                        help='precision of the points stored in memory, cache and npy/obj files (the iteration uses float64), '
+                        'the largest rounding error is reported, default: "{}"'.format(render_settings['precision']))
+    parser.add_argument('--chunk-size', type=int, default=render_settings['chunk'],
+                        help='number of points calculated and written to the outputs at once, default: {}'
+                        .format(render_settings['chunk']))
+    parser.add_argument('--cache', type=str,
+                        help='directory of the trajectory cache, cached trajectories are reused and extended, default: no cache')
+    parser.add_argument('--cache-size', type=float, default=cache_settings['size'],
+                        help='maximal size of the trajectory cache in megabytes, default: {}'.format(cache_settings['size']))
+    parser.add_argument('--catalog', type=str,
+                        help='sqlite database of tested attractors, known parameter strings are skipped, default: no catalog')
+    parser.add_argument('--query', type=int, default=0,
+                        help='render the Q found attractors of the catalog with the largest lyapunov exponents '
+                        'instead of searching, default: 0 (search)')
+    parser.add_argument('--list', type=str,
+                        help='batch render mode: render the parameter strings of file LIST ("-": stdin), one per line, '
+                        'optionally with map mode and options points, time, first, jump, interpolate and output '
+                        '(as name=value), "-n" and "-s" will be ignored')
+    parser.add_argument('--manifest', type=str, default='manifest.jsonl',
+                        help='json lines file of the outputs of batch render mode, default: "manifest.jsonl"')
+    parser.add_argument('--atlas', type=int, nargs=2, metavar=('I', 'J'),
+                        help='atlas mode: image of the scores of the parameter string "-s" with coefficients I and J '
+                        '(indices from 0) varied continuously over "--atlas-range"')
+    parser.add_argument('--atlas-range', type=float, nargs=4, default=[-1.2, 1.3, -1.2, 1.3],
+                        metavar=('XMIN', 'XMAX', 'YMIN', 'YMAX'),
+                        help='ranges of the coefficients I and J of atlas mode, default: -1.2 1.3 -1.2 1.3')
+    parser.add_argument('--atlas-size', type=int, default=atlas_settings['size'],
+                        help='pixels per axis of atlas mode, default: {}'.format(atlas_settings['size']))
+    parser.add_argument('--atlas-tile', type=int, default=atlas_settings['tile'],
+                        help='pixels per axis of the tiles of atlas mode (calculated at once), default: {}'
+                        .format(atlas_settings['tile']))
+    parser.add_argument('--atlas-score', type=str, default=atlas_settings['score'],
+                        choices=['escape', 'lyapunov', 'diversity'],
+                        help='score of atlas mode: "escape" iteration, "lyapunov" exponent or "diversity", '
+                        'default: "{}"'.format(atlas_settings['score']))
+    parser.add_argument('--enumerate', action='store_true',
+                        help='enumeration mode: search all parameter strings in order of their index (base 26, "A...A" '
+                        'is 0), implied by --prefix, --range and --shard, "-n" is ignored')
+    parser.add_argument('--prefix', type=str,
+                        help='enumerate the parameter strings starting with PREFIX')
+    parser.add_argument('--range', type=int, nargs=2, metavar=('START', 'STOP'),
+                        help='enumerate the parameter strings with index START to STOP - 1')
+    parser.add_argument('--shard', type=str, default='0/1',
+                        help='enumerate part i of N parts of (almost) equal size, given as "i/N" with 0 <= i < N, '
+                        'default: "0/1"')
+    parser.add_argument('--checkpoint', type=str,
+                        help='json file of the enumeration progress, a run with the same settings resumes from it')
+    parser.add_argument('--checkpoint-interval', type=float, default=enumeration_settings['interval'],
+                        help='minimal seconds between two checkpoints, default: {}'
+                        .format(enumeration_settings['interval']))
+    parser.add_argument('--profile', action='store_true',
+                        help='print time and calls per stage and histogram of rejections at the end')
+    parser.add_argument('--metrics-file', type=str,
+                        help='write events of tested attractors and summary of the profile as json lines to file')
+    parser.add_argument('--seed', type=int,
+                        help='seed for random search: integer >= 0, same seed finds same attractors for any number of workers')
 
     # parse arguments
     args = parser.parse_args()
+    args.enumerate = args.enumerate or args.prefix != None or args.range != None or args.shard != '0/1'
     
     # check user input
-    check_num_points(args.points)
-    check_output_modes(args.output)
-    check_map_mode(args.m)
-    check_sieve(args.jump)
-    check_first_point(args.first)
-    check_interpolate(args.interpolate)
-
-    if args.time != None:
-        check_time(args.time)
+    try:
+        check_arguments(args)
+    except ValueError as error:
+        sys.exit('error: {}'.format(error))
 
     if args.string != '':
-        check_string_length(args.m, args.string)
         args.number = 1
 
-    # search for attractor(s)
-    get_attractors(args.number, args.string, args.points, args.time, args.output, args.jump, args.first, args.m, args.interpolate)
+    # settings of the probe stage
+    probe = {'length': args.probe_length, 'window': args.probe_window, 'threshold': args.diversity,
+             'bound': args.bound, 'lyapunov': args.min_lyapunov, 'score': args.lyapunov, 'cycle': args.cycle_decimals,
+             'integrator': args.integrator, 'tolerance': args.tolerance, 'backend': args.backend,
+             'symmetry': args.symmetry, 'cells': args.min_cells, 'dimension': args.min_dimension}
+    print('Backend:', get_backend(probe))
+
+    # settings of the output
+    render = dict(render_settings, renderer=args.renderer, size=args.image_size, tone=args.tone, gamma=args.gamma,
+                  chunk=args.chunk_size, budget=args.html_points, plotlyjs=args.plotlyjs,
+                  ensemble=args.ensemble, frame=args.frame_points, encoder=args.encoder, precision=args.precision)
+
+    # settings of the trajectory cache
+    cache = dict(cache_settings, directory=args.cache, size=args.cache_size, precision=args.precision)
+    if args.cache != None:
+        os.makedirs(args.cache, exist_ok=True)
+
+    # read parameter strings of batch render mode
+    if args.list != None:
+        try:
+            items = read_batch_list(args.list, {'m': args.m, 'points': args.points, 'time': args.time,
+                                                'first': args.first, 'jump': args.jump,
+                                                'interpolate': args.interpolate, 'output': args.output})
+        except (ValueError, OSError) as error:
+            sys.exit('error: {}'.format(error))
+
+    # profile stages
+    if args.profile or args.metrics_file != None:
+        profiler.enable(args.metrics_file)
+
+    # search for attractor(s) or render list of parameter strings
+    try:
+        if args.list != None:
+            render_batch(items, args.manifest, args.workers, probe, render, cache)
+        elif args.atlas != None:
+            atlas = dict(atlas_settings, size=args.atlas_size, tile=args.atlas_tile, score=args.atlas_score)
+            try:
+                render_atlas(args.m, args.time if args.m[0:2] == '3d' else None, args.string, args.atlas,
+                             args.atlas_range, args.workers, probe, atlas)
+            except ValueError as error:
+                sys.exit('error: {}'.format(error))
+        else:
+            enumeration = None
+            if args.enumerate:
+                shard = tuple(int(part) for part in args.shard.split('/'))
+                enumeration = dict(enumeration_settings, checkpoint=args.checkpoint, interval=args.checkpoint_interval,
+                                   range=get_enumeration_range(int(args.m[3:]), args.prefix or '', args.range, shard))
+            try:
+                get_attractors(args.number, args.string, args.points, args.time, args.output, args.jump, args.first,
+                               args.m, args.interpolate, args.batch_size, args.workers, args.seed, probe, render, cache,
+                               args.catalog, args.query, enumeration)
+            except ValueError as error:
+                sys.exit('error: {}'.format(error))
+    finally:
+        if profiler.enabled:
+            profiler.finish(args.profile)
     
 
 # execute only if run as a script
@@ -0,0 +1,344 @@
+"""
+Program:     PyStrange render service
+Description: local http service rendering attractors of PyStrange as png density images,
+             with a worker pool, least recently used caches of trajectories and images
+             and coalescing of identical requests
+License:     GNU General Public License version 2 (see pystrange.py)
+"""
+
+# import modules
+import argparse
+import collections
+import concurrent.futures
+import http.server
+import json
+import multiprocessing
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+import urllib.parse
+
+import pystrange
+
+# default settings of the service: worker processes, capacity of the trajectory and image caches in megabytes,
+# precision of the cached trajectories, maximal number of points per request and seconds to wait for a result
+service_settings = {'workers': os.cpu_count() or 1, 'trajectories': 512, 'images': 64, 'precision': 'float32',
+                    'max_points': 10000000, 'timeout': 300}
+
+# parameters of a render request with type and default value (names of the options of pystrange.py)
+request_parameters = {'m': (str, None), 'string': (str, None), 'points': (int, 20000), 'time': (float, None),
+                      'first': (int, 200), 'jump': (int, 1), 'interpolate': (int, 1),
+                      'size': (int, pystrange.render_settings['size']), 'tone': (str, pystrange.render_settings['tone']),
+                      'gamma': (float, pystrange.render_settings['gamma'])}
+
+
+# least recently used cache of values with a size in bytes, the oldest values are evicted if the capacity
+# is exceeded (values larger than the capacity are not stored), thread safe
+class LRUCache:
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.values = collections.OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.values:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.values.move_to_end(key)
+            return self.values[key][0]
+
+    def put(self, key, value, size):
+        with self.lock:
+            if key in self.values:
+                self.size -= self.values.pop(key)[1]
+            if size > self.capacity:
+                return
+            self.values[key] = (value, size)
+            self.size += size
+            while self.size > self.capacity:
+                self.size -= self.values.popitem(last=False)[1][1]
+
+    def stats(self):
+        with self.lock:
+            return {'entries': len(self.values), 'bytes': self.size, 'capacity': self.capacity, 'hits': self.hits,
+                    'misses': self.misses}
+
+
+# parse and check parameters of a render request (query string), raise ValueError for invalid parameters,
+# return dict of the parameters (time None for 2D attractors)
+def parse_request(query, settings):
+
+    values = urllib.parse.parse_qs(query)
+    request = {}
+    for name, (kind, default) in request_parameters.items():
+        if name in values:
+            try:
+                request[name] = kind(values[name][-1])
+            except ValueError:
+                raise ValueError('parameter "{}" must be of type {}'.format(name, kind.__name__)) from None
+        elif default is None and name != 'time':
+            raise ValueError('parameter "{}" is missing'.format(name))
+        else:
+            request[name] = default
+
+    pystrange.check_map_mode(request['m'])
+    pystrange.check_parameter_string(request['string'])
+    pystrange.check_string_length(request['m'], request['string'])
+    pystrange.check_num_points(request['points'])
+    pystrange.check_first_point(request['first'])
+    pystrange.check_sieve(request['jump'])
+    pystrange.check_interpolate(request['interpolate'])
+    pystrange.check_image(request['size'], request['gamma'])
+    if request['time'] != None:
+        pystrange.check_time(request['time'])
+    if request['tone'] not in ('log', 'gamma'):
+        raise ValueError('tone must be "log" or "gamma"')
+    if request['points'] * request['interpolate'] > settings['max_points']:
+        raise ValueError('number of points times interpolate must be at most {}'.format(settings['max_points']))
+
+    if request['m'][0:2] == '2d':
+        request['time'] = None
+
+    return request
+
+
+# get keys of the trajectory and of the image of a render request
+def get_keys(request):
+    trajectory = tuple(request[name] for name in ('m', 'string', 'points', 'time', 'first', 'jump', 'interpolate'))
+    return trajectory, trajectory + (request['size'], request['tone'], request['gamma'])
+
+
+# render points of shape (dim, n) as png density image, return png data
+def render_image(points, request):
+    render = dict(pystrange.render_settings, size=request['size'], tone=request['tone'], gamma=request['gamma'])
+    dim = len(points)
+    image = pystrange.get_density_image(points[0], points[1], points[2] if dim == 3 else 0, '{}d'.format(dim), render)
+    return pystrange.encode_png(image)
+
+
+# calculate and render attractor of a render request in a worker process, or render a cached trajectory passed
+# as points in the thread of the request (so it is not copied to a worker). return success, png data (or reason
+# of rejection), seconds and the calculated points (None if rejected or passed)
+def compute_request(request, precision, points=None):
+
+    start = time.perf_counter()
+    if points is not None:
+        return True, render_image(points, request), time.perf_counter() - start, None
+
+    points, info = pystrange.compute_attractor(request['m'], request['string'], request['points'], request['time'],
+                                               request['first'], request['jump'], request['interpolate'],
+                                               precision=precision)
+    if points is None:
+        return False, info['reason'][1], time.perf_counter() - start, None
+
+    return True, render_image(points, request), time.perf_counter() - start, points
+
+
+# render service: images are served from the image cache, missing images are rendered from a cached trajectory
+# (in the thread of the request) or calculated from scratch in the worker pool. requests for an image in progress
+# wait for the same result (coalescing, a future stays pending until the result is in the caches),
+# rejected attractors are cached like images
+class RenderService:
+
+    def __init__(self, settings=service_settings):
+        self.settings = settings
+        self.pool = multiprocessing.Pool(settings['workers'])
+        self.trajectories = LRUCache(settings['trajectories'] * 2**20)
+        self.images = LRUCache(settings['images'] * 2**20)
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.counters = collections.Counter()
+        self.seconds = 0.0
+        self.started = time.time()
+
+    # return (True, png data) or (False, reason of rejection) for a render request
+    def render(self, request):
+
+        trajectory_key, image_key = get_keys(request)
+        with self.lock:
+            self.counters['requests'] += 1
+            result = self.images.get(image_key)
+            if result != None:
+                return result
+
+            owner = image_key not in self.pending
+            if owner:
+                points = self.trajectories.get(trajectory_key)
+                self.counters['rendered' if points is not None else 'computed'] += 1
+                self.pending[image_key] = concurrent.futures.Future()
+            else:
+                self.counters['coalesced'] += 1
+            pending = self.pending[image_key]
+
+        if not owner:
+            return pending.result(self.settings['timeout'])
+
+        try:
+            if points is not None:
+                found, data, seconds, points = compute_request(request, self.settings['precision'], points)
+            else:
+                found, data, seconds, points = self.pool.apply_async(
+                    compute_request, (request, self.settings['precision'])).get(self.settings['timeout'])
+        except BaseException as error:
+            with self.lock:
+                del self.pending[image_key]
+            pending.set_exception(error)
+            raise
+
+        # store the result before the request leaves the pending requests, so no request misses both
+        with self.lock:
+            if points is not None:
+                self.trajectories.put(trajectory_key, points, points.nbytes)
+            self.images.put(image_key, (found, data), len(data))
+            del self.pending[image_key]
+            self.seconds += seconds
+            self.counters['rejected'] += not found
+        pending.set_result((found, data))
+
+        return found, data
+
+    # return statistics of the service
+    def stats(self):
+        with self.lock:
+            counters = dict(self.counters)
+            work = self.counters['computed'] + self.counters['rendered']
+            return {'uptime': time.time() - self.started, 'workers': self.settings['workers'],
+                    'pending': len(self.pending), 'counters': counters,
+                    'seconds': self.seconds, 'mean_seconds': self.seconds / work if work else None,
+                    'trajectories': self.trajectories.stats(), 'images': self.images.stats()}
+
+    def close(self):
+        self.pool.terminate()
+
+
+# http handler of the render service: GET /render?m=...&string=... (png image, 400: invalid parameters,
+# 422: rejected attractor), GET /health and GET /stats (json)
+class RenderHandler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    service = None
+    quiet = False
+
+    def do_GET(self):
+
+        url = urllib.parse.urlsplit(self.path)
+        try:
+            if url.path == '/render':
+                request = parse_request(url.query, self.service.settings)
+                found, data = self.service.render(request)
+                if found:
+                    self.reply(200, 'image/png', data)
+                else:
+                    self.reply_json(422, {'error': 'attractor {} {}'.format(request['string'], data)})
+            elif url.path == '/health':
+                self.reply_json(200, {'status': 'ok'})
+            elif url.path == '/stats':
+                self.reply_json(200, self.service.stats())
+            else:
+                self.reply_json(404, {'error': 'unknown path {}'.format(url.path)})
+        except ValueError as error:
+            self.reply_json(400, {'error': str(error)})
+        except (multiprocessing.TimeoutError, concurrent.futures.TimeoutError):
+            self.reply_json(503, {'error': 'timeout'})
+        except BrokenPipeError:
+            pass
+        except Exception as error:
+            with self.service.lock:
+                self.service.counters['errors'] += 1
+            self.reply_json(500, {'error': repr(error)})
+
+    def reply(self, status, content_type, data):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def reply_json(self, status, value):
+        self.reply(status, 'application/json', json.dumps(value, default=int).encode())
+
+    def address_string(self):
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+# threading http server on a unix socket
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+# main function
+def main():
+
+    parser = argparse.ArgumentParser(description='Local render service of PyStrange')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='address to listen on, default: "127.0.0.1"')
+    parser.add_argument('--port', type=int, default=8000, help='port to listen on, default: 8000')
+    parser.add_argument('--socket', type=str, help='unix socket to listen on instead of host and port')
+    parser.add_argument('-w', '--workers', type=int, default=service_settings['workers'],
+                        help='number of worker processes, default: number of cpus')
+    parser.add_argument('--trajectory-cache', type=float, default=service_settings['trajectories'],
+                        help='capacity of the trajectory cache in megabytes, default: {}'
+                        .format(service_settings['trajectories']))
+    parser.add_argument('--image-cache', type=float, default=service_settings['images'],
+                        help='capacity of the image cache in megabytes, default: {}'.format(service_settings['images']))
+    parser.add_argument('--precision', type=str, default=service_settings['precision'],
+                        choices=['float64', 'float32', 'float16'],
+                        help='precision of the cached trajectories, default: "{}"'.format(service_settings['precision']))
+    parser.add_argument('--max-points', type=int, default=service_settings['max_points'],
+                        help='maximal number of points (times interpolate) per request, default: {}'
+                        .format(service_settings['max_points']))
+    parser.add_argument('--timeout', type=float, default=service_settings['timeout'],
+                        help='seconds to wait for a result, default: {}'.format(service_settings['timeout']))
+    parser.add_argument('-q', '--quiet', action='store_true', help='do not log requests')
+    args = parser.parse_args()
+
+    try:
+        pystrange.check_workers(args.workers)
+    except ValueError as error:
+        sys.exit('error: {}'.format(error))
+
+    settings = dict(service_settings, workers=args.workers, trajectories=args.trajectory_cache,
+                    images=args.image_cache, precision=args.precision, max_points=args.max_points,
+                    timeout=args.timeout)
+    service = RenderService(settings)
+    RenderHandler.service = service
+    RenderHandler.quiet = args.quiet
+
+    # stop on SIGTERM like on SIGINT (the worker processes are already started)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    if args.socket != None:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        server = UnixHTTPServer(args.socket, RenderHandler)
+        print('Render service on unix socket {} with {} worker(s)'.format(args.socket, args.workers))
+    else:
+        server = http.server.ThreadingHTTPServer((args.host, args.port), RenderHandler)
+        print('Render service on http://{}:{} with {} worker(s)'.format(args.host, server.server_port, args.workers))
+
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if args.socket != None and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+# execute only if run as a script
+if __name__ == "__main__":
+    main()
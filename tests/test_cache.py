@@ -0,0 +1,74 @@
+"""
+Tests of the trajectory cache against the tests and the lyapunov exponent of an uncached trajectory
+"""
+
+# import modules
+import numpy as np
+import pytest
+
+import pystrange
+
+
+# iterate an attractor with the cache, return its points and info
+def run_cached(cache, probe, parameter_string='AGWXDCUKEANF', num_points=5000):
+
+    info = {}
+    map_function = pystrange.get_map_function('2d_12')
+    chunks = [chunk.copy() for first, chunk in pystrange.generate_cached_attractor(
+        cache, parameter_string, num_points, None, 0, '2d_12', map_function, info, probe, chunk_size=1000)]
+    points = np.concatenate(chunks, axis=1) if len(chunks) > 0 else None
+
+    return points, info
+
+
+# a cached trajectory with the same settings is read again
+def test_cache_hit_returns_cached_points(tmp_path):
+
+    cache = dict(pystrange.cache_settings, directory=str(tmp_path))
+    probe = dict(pystrange.probe_settings)
+    points, info = run_cached(cache, probe)
+    assert info['reason'] is None and info['diversity'] is not None
+    cached_points, cached_info = run_cached(cache, probe)
+
+    assert cached_info['reason'] is None and cached_info['diversity'] is None
+    assert np.array_equal(points, cached_points)
+
+
+# a cached trajectory is tested again with stricter settings
+def test_cache_hit_applies_current_tests(tmp_path):
+
+    cache = dict(pystrange.cache_settings, directory=str(tmp_path))
+    run_cached(cache, dict(pystrange.probe_settings))
+    points, info = run_cached(cache, dict(pystrange.probe_settings, threshold=pystrange.probe_settings['window'] + 2))
+
+    assert info['reason'] is not None and info['reason'][0] == 'diversity'
+
+
+# a cached trajectory without lyapunov exponent is calculated again if the exponent is needed
+def test_cache_hit_estimates_missing_lyapunov_exponent(tmp_path):
+
+    cache = dict(pystrange.cache_settings, directory=str(tmp_path))
+    run_cached(cache, dict(pystrange.probe_settings))
+    probe = dict(pystrange.probe_settings, score=True)
+    points, info = run_cached(cache, probe)
+    uncached_info = {}
+    for first, chunk in pystrange.generate_attractor('AGWXDCUKEANF', 5000, None, 0, '2d_12',
+                                                     pystrange.get_map_function('2d_12'), uncached_info, probe):
+        pass
+
+    assert info['lyapunov'] is not None and info['lyapunov'] == uncached_info['lyapunov']
+    cached_points, cached_info = run_cached(cache, probe)
+    assert cached_info['diversity'] is None and cached_info['lyapunov'] == info['lyapunov']
+
+
+# a trajectory cached by a run shorter than the probe is tested again by a longer run
+@pytest.mark.parametrize('parameter_string', ['ENYWSQBTMCGO', 'PWEXSBNISFMM', 'ESZDHHMLRCNC'])
+def test_cache_hit_after_short_run_applies_diversity_test(tmp_path, parameter_string):
+
+    cache = dict(pystrange.cache_settings, directory=str(tmp_path))
+    probe = dict(pystrange.probe_settings)
+    points, info = run_cached(cache, probe, parameter_string, num_points=50)
+    assert info['reason'] is None
+    points, info = run_cached(cache, probe, parameter_string)
+
+    assert info['reason'] is not None and info['reason'][0] == 'diversity'
@@ -0,0 +1,87 @@
+"""
+Tests of the shards and checkpoints of the enumeration mode
+"""
+
+# import modules
+import itertools
+import json
+
+import pytest
+
+import pystrange
+
+
+# prefix of the enumerated strings (676 strings of map 2d_12 around a known attractor)
+prefix = 'AGWXDCUKEA'
+
+
+# enumerate the strings of a range with get_attractors, return the checkpoint written at the end
+def enumerate_range(index_range, checkpoint_file):
+
+    enumeration = dict(pystrange.enumeration_settings, range=index_range, checkpoint=str(checkpoint_file))
+    pystrange.get_attractors(0, '', 2000, None, [], 1, 100, '2d_12', 0, enumeration=enumeration)
+    with open(checkpoint_file) as infile:
+        return json.load(infile)
+
+
+# the shards of a prefix are disjoint and their union is the range of the prefix
+@pytest.mark.parametrize('count', [1, 2, 3, 7, 26, 1000])
+def test_shards_cover_prefix_without_overlap(count):
+
+    start, stop = pystrange.get_enumeration_range(12, prefix)
+    shards = [pystrange.get_enumeration_range(12, prefix, shard=(i, count)) for i in range(count)]
+    strings = [string for first, last in shards for string in pystrange.get_indexed_strings(pystrange.coeff, 12,
+                                                                                             first, last)]
+
+    assert shards[0][0] == start and shards[-1][1] == stop
+    assert all(shards[i][1] == shards[i + 1][0] for i in range(count - 1))
+    assert len(strings) == len(set(strings))
+    assert set(strings) == {prefix + ''.join(letters) for letters in itertools.product(pystrange.coeff, repeat=2)}
+
+
+# the attractors found by the shards are the attractors found without shards
+def test_shards_find_attractors_of_prefix(tmp_path, monkeypatch):
+
+    monkeypatch.chdir(tmp_path)
+    found = enumerate_range(pystrange.get_enumeration_range(12, prefix), tmp_path / 'all.json')['found']
+    shards = [enumerate_range(pystrange.get_enumeration_range(12, prefix, shard=(i, 3)), tmp_path / '{}.json'.format(i))
+              for i in range(3)]
+
+    assert len(found) > 0
+    assert [string for checkpoint in shards for string in checkpoint['found']] == found
+
+
+# an interrupted enumeration resumes at the next string of its checkpoint and finds the same attractors
+def test_checkpoint_resumes_interrupted_enumeration(tmp_path, monkeypatch):
+
+    monkeypatch.chdir(tmp_path)
+    index_range = pystrange.get_enumeration_range(12, prefix)
+    complete = enumerate_range(index_range, tmp_path / 'complete.json')
+
+    # interrupt the enumeration after three chunks, record the chunks of the resumed enumeration
+    search_seeded_chunks = pystrange.search_seeded_chunks
+    chunks = []
+
+    def interrupted(*args, **kwargs):
+        for k, (guess_range, results) in enumerate(search_seeded_chunks(*args, **kwargs)):
+            if k == 3:
+                raise KeyboardInterrupt
+            yield guess_range, results
+
+    def recorded(*args, **kwargs):
+        for guess_range, results in search_seeded_chunks(*args, **kwargs):
+            chunks.append(guess_range)
+            yield guess_range, results
+
+    monkeypatch.setattr(pystrange, 'search_seeded_chunks', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        enumerate_range(index_range, tmp_path / 'resumed.json')
+    with open(tmp_path / 'resumed.json') as infile:
+        stopped = json.load(infile)
+    monkeypatch.setattr(pystrange, 'search_seeded_chunks', recorded)
+    resumed = enumerate_range(index_range, tmp_path / 'resumed.json')
+
+    assert stopped['next'] == index_range[0] + 300
+    assert chunks[0][0] == stopped['next'] and chunks[-1][1] == index_range[1]
+    assert resumed['found'] == complete['found']
+    assert resumed['rejections'] == complete['rejections']
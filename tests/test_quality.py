@@ -0,0 +1,51 @@
+"""
+Tests of the streaming quality statistics against the chunk size and the trajectory cache
+"""
+
+# import modules
+import pytest
+
+import pystrange
+
+
+# iterate an attractor with the quality statistics (with a cache: twice, to read it from the cache),
+# return quality statistics and reason of rejection
+def run_quality(chunk_size, probe, cache=None, parameter_string='AGWXDCUKEANF', num_points=100000, plot_offset=200):
+
+    map_function = pystrange.get_map_function('2d_12')
+    for k in range(1 if cache is None else 2):
+        info = {}
+        if cache is None:
+            chunks = pystrange.generate_attractor(parameter_string, num_points, None, plot_offset, '2d_12',
+                                                  map_function, info, probe, chunk_size)
+        else:
+            chunks = pystrange.generate_cached_attractor(cache, parameter_string, num_points, None, plot_offset,
+                                                         '2d_12', map_function, info, probe, chunk_size)
+        for chunk in pystrange.track_quality(chunks, info, 2, plot_offset, parameter_string, probe):
+            pass
+
+    return info['quality'], info['reason']
+
+
+# the statistics of a found attractor and the rejection of a degenerate one are the same for all chunk sizes
+@pytest.mark.parametrize('cells', [None, 6000])
+def test_quality_independent_of_chunk_size(cells):
+
+    probe = dict(pystrange.probe_settings, cells=cells, dimension=1.0)
+    expected = run_quality(100000, probe)
+    assert (expected[0] is None) == (cells != None)
+
+    for chunk_size in [7, 333, 1000, 4096]:
+        assert run_quality(chunk_size, probe) == expected
+
+
+# the statistics of a trajectory read from the cache are the statistics of the calculated trajectory
+def test_quality_independent_of_cache(tmp_path):
+
+    probe = dict(pystrange.probe_settings, dimension=1.0)
+    expected = run_quality(100000, probe)
+    cache = dict(pystrange.cache_settings, directory=str(tmp_path))
+
+    assert expected[0]['dimension'] is not None
+    assert run_quality(4096, probe, cache) == expected
+    assert run_quality(333, probe, cache) == expected
@@ -0,0 +1,85 @@
+"""
+Tests of the symmetry groups of the parameter strings and of the trajectories shared in the cache
+"""
+
+# import modules
+import os
+
+import numpy as np
+import pytest
+
+import pystrange
+
+
+# get all valid symmetric strings of a parameter string (including the string itself)
+def get_siblings(parameter_string, m, symmetry):
+
+    letters = list(pystrange.coeff.keys())
+    indices = np.array([[letters.index(letter) for letter in parameter_string]])
+    siblings = []
+    for perm, signs, source, sign in pystrange.get_symmetries(m, symmetry):
+        transformed, valid = pystrange.transform_indices(indices, source, sign)
+        if valid[0]:
+            siblings.append(''.join(letters[k] for k in transformed[0]))
+
+    return siblings
+
+
+# iterate an attractor with generate_attractor or (with a cache) generate_cached_attractor, return its points
+def run(parameter_string, probe, cache=None, m='2d_12', num_points=2000):
+
+    info = {}
+    map_function = pystrange.get_map_function(m)
+    if cache is None:
+        chunks = pystrange.generate_attractor(parameter_string, num_points, None, 0, m, map_function, info, probe)
+    else:
+        chunks = pystrange.generate_cached_attractor(cache, parameter_string, num_points, None, 0, m, map_function,
+                                                     info, probe)
+    points = np.concatenate([chunk.copy() for first, chunk in chunks], axis=1)
+    assert info['reason'] is None
+
+    return points
+
+
+# all symmetric strings have the same canonical string, which is the smallest one and the only canonical one
+@pytest.mark.parametrize('m', ['2d_12', '2d_20', '3d_30'])
+@pytest.mark.parametrize('symmetry', ['permute', 'full'])
+def test_symmetric_strings_have_same_canonical_string(m, symmetry):
+
+    rng = np.random.default_rng(0)
+    letters = list(pystrange.coeff.keys())[:-1]
+    for k in range(20):
+        string = ''.join(rng.choice(letters, size=int(m[3:])))
+        siblings = get_siblings(string, m, symmetry)
+        canonical = pystrange.get_canonical(string, m, symmetry)[0]
+
+        assert canonical == min(siblings)
+        assert all(pystrange.get_canonical(sibling, m, symmetry)[0] == canonical for sibling in siblings)
+        assert (pystrange.check_canonical(siblings, m, symmetry) == [sibling == canonical for sibling in siblings]).all()
+
+
+# the cached trajectory of the canonical string mapped back to a symmetric string is its trajectory: exactly if the
+# string calculated the cached trajectory, else within rounding for the first iterations (the sums of the map are
+# rounded in another order, so the trajectories separate like all chaotic trajectories)
+def test_cache_maps_canonical_trajectory_to_symmetric_strings(tmp_path):
+
+    cache = dict(pystrange.cache_settings, directory=str(tmp_path))
+    probe = dict(pystrange.probe_settings, symmetry='full')
+    siblings = get_siblings('AGWXDCUKEANF', '2d_12', 'full')
+    assert len(siblings) == 8
+
+    calculated = set()
+    for sibling in siblings:
+        canonical, perm, signs = pystrange.get_canonical(sibling, '2d_12', 'full')
+        points = run(sibling, probe)
+        cached = run(sibling, probe, cache)
+
+        # sign flips change the start value, the strings with the same signs share a trajectory
+        if tuple(signs) not in calculated:
+            calculated.add(tuple(signs))
+            assert np.array_equal(points, cached)
+        else:
+            np.testing.assert_allclose(cached[:, :20], points[:, :20], rtol=0, atol=1e-12)
+        assert np.array_equal(cached, run(sibling, probe, cache))
+
+    assert len([name for name in os.listdir(tmp_path) if name.endswith('.npy')]) == len(calculated) == 4